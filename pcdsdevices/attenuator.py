@@ -1,9 +1,13 @@
 """
 Module for `Attenuator` and related classes.
 """
+import collections
 import enum
+import functools
 import logging
+import threading
 import time
+import typing
 
 import numpy as np
 import prettytable
@@ -13,13 +17,15 @@ from ophyd.device import DynamicDeviceComponent as DDC
 from ophyd.device import FormattedComponent as FCpt
 from ophyd.pv_positioner import PVPositioner, PVPositionerPC
 from ophyd.signal import EpicsSignal, EpicsSignalRO, Signal, SignalRO
+from ophyd.sim import NullStatus
+from ophyd.status import wait as status_wait
 
 from . import utils
 from .device import UnrelatedComponent as UCpt
 from .epics_motor import BeckhoffAxis
 from .inout import InOutPositioner, TwinCATInOutPositioner
 from .interface import BaseInterface, FltMvInterface, LightpathInOutMixin
-from .signal import InternalSignal
+from .signal import InternalSignal, put_batch
 from .utils import get_status_float, get_status_value
 from .variety import set_metadata
 
@@ -434,17 +440,6 @@ def Attenuator(prefix, n_filters, *, name, **kwargs):
     return cls(prefix, name=name, **kwargs)
 
 
-'''
-# WIP
-def set_combined_attenuation(attenuation, *attenuators):
-    for i in range(len(attenuators)):
-        if i < len(attenuators)-1:
-            attenuators[i].actuate_value(force_ceil=True)
-        else:
-            attenuators[i].actuate_value()
-'''
-
-
 class FEESolidAttenuatorBlade(BaseInterface, Device, LightpathInOutMixin):
     lightpath_cpts = ['state']
 
@@ -676,15 +671,17 @@ class AttenuatorCalculatorBase(BaseInterface, Device):
             floor.
         """
 
-        if energy is not None:
-            self.energy_source.put('Custom')
-            self.energy_custom.put(float(energy))
-        else:
-            self.energy_source.put('Actual')
+        with put_batch() as batch:
+            if energy is not None:
+                batch.put(self.energy_source, 'Custom')
+                batch.put(self.energy_custom, float(energy))
+            else:
+                batch.put(self.energy_source, 'Actual')
 
-        self.calc_mode.put('Floor' if use_floor else 'Ceiling')
-        self.desired_transmission.put(transmission)
-        self.run_calculation.put(1, wait=True)
+            batch.put(self.calc_mode, 'Floor' if use_floor else 'Ceiling')
+            batch.put(self.desired_transmission, transmission)
+            batch.barrier()
+            batch.put(self.run_calculation, 1)
         return self.get_best_config(use_monitor=False)
 
 
@@ -1236,3 +1233,635 @@ def render_ascii_att(blade_states, *, start_index=0):
     return [separator.join(filter_line + ['']),
             separator.join(out_line + ['']),
             separator.join(in_line + [''])]
+
+
+def filter_transmission(material, thickness, energy):
+    """
+    Calculate the transmission of a single solid filter.
+
+    Parameters
+    ----------
+    material : str
+        The material formula or name, e.g. ``'Si'``.
+
+    thickness : float
+        The filter thickness in microns.
+
+    energy : float
+        The photon energy in eV.
+
+    Returns
+    -------
+    transmission : float
+        The normalized transmission, from 0 to 1.
+    """
+    # Imported here because loading the cross section tables is slow
+    from pcdscalc.xray import transmission
+    return float(transmission(material, thickness * 1e-6, energy))
+
+
+class AttenuatorConfig(typing.NamedTuple):
+    """A filter configuration and its transmission."""
+    #: The inserted filter on each blade, 0 for out.
+    config: tuple
+    transmission: float
+
+
+class AttenuatorSolution(typing.NamedTuple):
+    """The configurations found by `AttenuatorSolver.solve`."""
+    #: The highest transmission at or below the desired value.
+    floor: AttenuatorConfig
+    #: The lowest transmission at or above the desired value.
+    ceiling: AttenuatorConfig
+    #: Whichever of floor and ceiling is closest, favoring the floor.
+    best: AttenuatorConfig
+
+
+class AttenuatorSolver:
+    """
+    Calculate solid attenuator configurations without the IOC.
+
+    The transmission of every possible filter configuration is calculated at
+    once with NumPy and cached per photon energy bin. After that, finding the
+    floor, ceiling and best configuration for a desired transmission is a
+    binary search. This makes it cheap to plan attenuation for every point of
+    an energy scan ahead of time.
+
+    Configurations are tuples with one entry per blade: 0 if the blade is
+    out, otherwise the one-based index of the inserted filter. For
+    attenuators with one filter per blade this is 0 for out and 1 for in.
+
+    Parameters
+    ----------
+    blades : list of list
+        The filters on each blade, as ``(material, thickness)`` pairs with
+        thicknesses in microns. Blades that move a single filter in and out
+        have one entry, ladder blades have one entry per filter. Use `None`
+        for empty or unusable filter slots.
+
+    fixed : dict, optional
+        Blades that cannot be moved, as a mapping of the zero-based blade
+        index to the config entry that the blade is stuck at.
+
+    energy_bin : float, optional
+        Width of the photon energy bins in eV. Transmissions are calculated
+        at the nearest multiple of this.
+
+    cache_size : int, optional
+        The number of energy bins to keep in the cache. For 18 filters, each
+        bin takes about 3 MB.
+
+    transmission_func : callable, optional
+        ``transmission_func(material, thickness, energy)`` for a single
+        filter. Defaults to `filter_transmission`.
+    """
+
+    def __init__(self, blades, *, fixed=None, energy_bin=1.0, cache_size=16,
+                 transmission_func=filter_transmission):
+        self.blades = [list(filters) for filters in blades]
+        self.fixed = dict(fixed or {})
+        self.energy_bin = energy_bin
+        self.cache_size = cache_size
+        self.transmission_func = transmission_func
+        self._cache = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # The config entries that each blade may use
+        self.options = []
+        for index, filters in enumerate(self.blades):
+            if index in self.fixed:
+                options = [self.fixed[index]]
+            else:
+                options = [0] + [num for num, filt in enumerate(filters, 1)
+                                 if filt is not None]
+            self.options.append(np.asarray(options))
+        self.shape = tuple(len(options) for options in self.options)
+
+    @classmethod
+    def from_device(cls, device, **kwargs):
+        """
+        Make a solver from the filters of an attenuator device.
+
+        This reads the materials and thicknesses once. Filters that are
+        marked as inactive in the new-style calculator IOCs are left out.
+        Blades with a stuck filter are held at their current position, as
+        are filters that are stuck in or out on `AttBase` attenuators.
+
+        Parameters
+        ----------
+        device : AttBase, AT2L0 or AttenuatorSXR_Ladder
+            The attenuator. For `AT2L0`, blade 0 of the solver is the
+            calculator's first filter, index 2.
+
+        **kwargs :
+            Passed to the `AttenuatorSolver` constructor.
+        """
+        blades = []
+        fixed = {}
+        if isinstance(device, AttBase):
+            for index, filt in enumerate(device.filters):
+                blades.append([(filt.material.get(as_string=True),
+                                filt.thickness.get())])
+                stuck = filt.stuck.get()
+                if stuck == 1:
+                    fixed[index] = 1
+                elif stuck == 2:
+                    fixed[index] = 0
+        else:
+            calculator = device.calculator
+            current = _get_current_config(device)
+            for index, (_, blade) in enumerate(
+                    sorted(calculator.filters_by_index.items())):
+                if isinstance(blade, AttenuatorCalculatorSXR_Blade):
+                    filters = [getattr(blade, attr) for _, attr in
+                               sorted(blade._filter_index_to_attr.items())]
+                else:
+                    filters = [blade]
+                if any(filt.is_stuck.get() for filt in filters):
+                    # Only the current entry is used, whether active or not
+                    blades.append([(filt.material.get(), filt.thickness.get())
+                                   for filt in filters])
+                    if current[index] < 0:
+                        logger.warning('Stuck blade %d of %s is in an '
+                                       'unknown position, treating it as '
+                                       'out.', index, device.name)
+                    fixed[index] = max(current[index], 0)
+                else:
+                    blades.append([_calculator_filter_info(filt)
+                                   for filt in filters])
+        fixed.update(kwargs.pop('fixed', {}))
+        return cls(blades, fixed=fixed, **kwargs)
+
+    def _energy_key(self, energy):
+        return int(round(energy / self.energy_bin))
+
+    def transmissions(self, energy):
+        """
+        Get the transmission of every configuration at a photon energy.
+
+        Parameters
+        ----------
+        energy : float
+            The photon energy in eV.
+
+        Returns
+        -------
+        transmissions : numpy.ndarray
+            One transmission per configuration, indexed like
+            ``numpy.ravel_multi_index`` over `shape`. Use `get_config` to
+            turn an index into a configuration.
+        """
+        return self._get_table(energy)[0]
+
+    def _get_table(self, energy):
+        """Get the transmissions and their sorted order for an energy."""
+        key = self._energy_key(energy)
+        with self._cache_lock:
+            try:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            except KeyError:
+                pass
+        table = self._make_table(key * self.energy_bin)
+        with self._cache_lock:
+            self._cache[key] = table
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return table
+
+    def _make_table(self, energy):
+        # Add up the log transmissions of every combination of blade
+        # positions. The last blade changes fastest, as in ravel_multi_index.
+        log_total = np.zeros(1)
+        for filters, options in zip(self.blades, self.options):
+            log_trans = np.zeros(len(options))
+            for num, option in enumerate(options):
+                if option:
+                    material, thickness = filters[option - 1]
+                    log_trans[num] = np.log(self.transmission_func(
+                        material, thickness, energy))
+            log_total = np.add.outer(log_total, log_trans).ravel()
+        transmissions = np.exp(log_total)
+        order = np.argsort(transmissions, kind='stable').astype(np.int32)
+        return transmissions, order, transmissions[order]
+
+    def motions(self, config):
+        """
+        Count the blade motions needed to reach each configuration.
+
+        Parameters
+        ----------
+        config : tuple of int
+            The current configuration. Use -1 for blades in an unknown
+            position, which count as moving for every configuration.
+
+        Returns
+        -------
+        motions : numpy.ndarray
+            The number of blades to move, indexed like `transmissions`.
+        """
+        total = np.zeros(1, dtype=np.int8)
+        for options, current in zip(self.options, config):
+            moves = (options != current).astype(np.int8)
+            total = np.add.outer(total, moves).ravel()
+        return total
+
+    def get_config(self, index):
+        """
+        Get the configuration for an index into `transmissions`.
+
+        Parameters
+        ----------
+        index : int
+            The configuration index.
+
+        Returns
+        -------
+        config : tuple of int
+            The inserted filter on each blade, 0 for out.
+        """
+        positions = np.unravel_index(index, self.shape)
+        return tuple(int(options[pos])
+                     for options, pos in zip(self.options, positions))
+
+    def solve(self, transmission, energy):
+        """
+        Find the configurations closest to a desired transmission.
+
+        If the desired transmission cannot be reached, the floor and ceiling
+        fall back to the closest configuration available.
+
+        Parameters
+        ----------
+        transmission : float
+            The desired transmission, in the range [0, 1].
+
+        energy : float
+            The photon energy in eV.
+
+        Returns
+        -------
+        solution : AttenuatorSolution
+            The floor, ceiling and best configurations.
+        """
+        transmissions, order, sorted_trans = self._get_table(energy)
+        last = len(sorted_trans) - 1
+        floor = np.searchsorted(sorted_trans, transmission, side='right') - 1
+        ceiling = np.searchsorted(sorted_trans, transmission, side='left')
+        floor = min(max(floor, 0), last)
+        ceiling = min(ceiling, last)
+
+        floor = self._make_config(order[floor], transmissions)
+        ceiling = self._make_config(order[ceiling], transmissions)
+        if (abs(transmission - ceiling.transmission)
+                < abs(transmission - floor.transmission)):
+            best = ceiling
+        else:
+            best = floor
+        return AttenuatorSolution(floor=floor, ceiling=ceiling, best=best)
+
+    def _make_config(self, index, transmissions):
+        return AttenuatorConfig(config=self.get_config(index),
+                                transmission=float(transmissions[index]))
+
+
+def _calculator_filter_info(filt):
+    """Get the material and thickness of an active calculator filter."""
+    if not filt.active.get():
+        return None
+    return (filt.material.get(), filt.thickness.get())
+
+
+class CombinedAttenuation(typing.NamedTuple):
+    """A configuration for several attenuators."""
+    #: The configuration of each attenuator, see `AttenuatorSolver`.
+    configs: tuple
+    #: The combined transmission of all of the attenuators.
+    transmission: float
+    #: The total number of blades that need to move.
+    motions: int
+
+
+class AttenuatorCoordinator:
+    """
+    Drive several solid attenuators toward one combined transmission.
+
+    The attenuators are in series, so the combined transmission is the
+    product of their transmissions. Configurations are searched jointly in
+    order of the number of blades they move: the first configurations that
+    are within ``rtol`` of the goal win, and the closest of them is used. If
+    nothing is within ``rtol``, the closest configuration overall is used,
+    with the fewest motions among equally close configurations.
+
+    Blades are moved directly and all at once, without going through the
+    attenuator calculator IOCs.
+
+    Parameters
+    ----------
+    *attenuators : AttBase, AT2L0 or AttenuatorSXR_Ladder
+        The attenuators to coordinate.
+
+    rtol : float, optional
+        The relative difference from the desired transmission that counts as
+        meeting it.
+
+    **kwargs :
+        Passed to `AttenuatorSolver.from_device`.
+    """
+
+    def __init__(self, *attenuators, rtol=0.05, **kwargs):
+        self.attenuators = attenuators
+        self.rtol = rtol
+        self._solver_kwargs = kwargs
+        self._solvers = None
+
+    @property
+    def solvers(self):
+        """One `AttenuatorSolver` per attenuator, made on first use."""
+        if self._solvers is None:
+            self.refresh()
+        return self._solvers
+
+    def refresh(self):
+        """Read the filter materials and thicknesses again."""
+        self._solvers = [
+            AttenuatorSolver.from_device(att, **self._solver_kwargs)
+            for att in self.attenuators
+        ]
+
+    def get_energies(self, energy=None):
+        """Get the photon energy for each attenuator's calculation, in eV."""
+        if energy is not None:
+            return [energy] * len(self.attenuators)
+        energies = []
+        for att in self.attenuators:
+            if isinstance(att, AttBase):
+                energies.append(att.energy.get())
+            else:
+                energies.append(att.calculator.energy_actual.get())
+        return energies
+
+    def get_current_configs(self):
+        """Get the current configuration of each attenuator."""
+        return [_get_current_config(att) for att in self.attenuators]
+
+    def plan(self, transmission, energy=None):
+        """
+        Find the combined configuration for a desired transmission.
+
+        Parameters
+        ----------
+        transmission : float
+            The desired combined transmission, in the range [0, 1].
+
+        energy : float, optional
+            The photon energy in eV. Defaults to each attenuator's own
+            photon energy readback.
+
+        Returns
+        -------
+        combined : CombinedAttenuation
+            The configurations to use.
+        """
+        return self._plan(transmission, energy=energy)[0]
+
+    def _plan(self, transmission, energy=None):
+        """Plan, also returning the configurations that it started from."""
+        energies = self.get_energies(energy)
+        currents = self.get_current_configs()
+        groups = [
+            _group_by_motions(solver.transmissions(energy),
+                              solver.motions(current))
+            for solver, energy, current in zip(self.solvers, energies,
+                                               currents)
+        ]
+        goal = np.log(max(transmission, np.finfo(float).tiny))
+        error, log_trans, motions, indices = _search_motion_groups(
+            groups, goal, np.log1p(self.rtol))
+        configs = tuple(solver.get_config(index)
+                        for solver, index in zip(self.solvers, indices))
+        combined = CombinedAttenuation(configs=configs,
+                                       transmission=float(np.exp(log_trans)),
+                                       motions=int(motions))
+        return combined, currents
+
+    def set(self, transmission, energy=None, moved_cb=None, timeout=None,
+            wait=False):
+        """
+        Move all of the attenuators to reach a combined transmission.
+
+        Parameters
+        ----------
+        transmission : float
+            The desired combined transmission, in the range [0, 1].
+
+        energy : float, optional
+            The photon energy in eV. Defaults to each attenuator's own
+            photon energy readback.
+
+        moved_cb : callable, optional
+            Called as ``moved_cb(obj=self)`` once every blade has moved.
+
+        timeout : float, optional
+            Timeout for each blade motion.
+
+        wait : bool, optional
+            If `True`, wait for every blade to finish moving.
+
+        Returns
+        -------
+        status : StatusBase
+            Combined status for all of the blade motions.
+        """
+        combined, currents = self._plan(transmission, energy=energy)
+        logger.debug('Moving %d blades for a combined transmission of %s',
+                     combined.motions, combined.transmission)
+        status = NullStatus()
+        for att, solver, config, current in zip(self.attenuators,
+                                                self.solvers,
+                                                combined.configs, currents):
+            positioners = _blade_positioners(att)
+            for index, (entry, now) in enumerate(zip(config, current)):
+                if entry == now or index in solver.fixed:
+                    continue
+                status = status & _move_blade(att, positioners[index], entry,
+                                              timeout=timeout)
+
+        if moved_cb is not None:
+            status.add_callback(functools.partial(moved_cb, obj=self))
+
+        if wait:
+            status_wait(status)
+
+        return status
+
+
+def set_combined_attenuation(transmission, *attenuators, energy=None,
+                             rtol=0.05, timeout=None, wait=False):
+    """
+    Move several attenuators to reach one combined transmission.
+
+    This is a shortcut for `AttenuatorCoordinator.set`. Make an
+    `AttenuatorCoordinator` instead to avoid reading the filter information
+    every time.
+
+    Parameters
+    ----------
+    transmission : float
+        The desired combined transmission, in the range [0, 1].
+
+    *attenuators : AttBase, AT2L0 or AttenuatorSXR_Ladder
+        The attenuators to use.
+
+    energy : float, optional
+        The photon energy in eV. Defaults to each attenuator's own photon
+        energy readback.
+
+    rtol : float, optional
+        The relative difference from the desired transmission that counts as
+        meeting it.
+
+    timeout : float, optional
+        Timeout for each blade motion.
+
+    wait : bool, optional
+        If `True`, wait for every blade to finish moving.
+
+    Returns
+    -------
+    status : StatusBase
+        Combined status for all of the blade motions.
+    """
+    coordinator = AttenuatorCoordinator(*attenuators, rtol=rtol)
+    return coordinator.set(transmission, energy=energy, timeout=timeout,
+                           wait=wait)
+
+
+def _blade_positioners(device):
+    """Get the state positioner for each `AttenuatorSolver` blade."""
+    if isinstance(device, AttBase):
+        return list(device.filters)
+    return [getattr(device, f'blade_{index:02}').state
+            for index in sorted(device.calculator.filters_by_index)]
+
+
+def _get_current_config(device):
+    """Get the current `AttenuatorSolver` configuration of a device."""
+    if isinstance(device, AttBase):
+        # Filter states are 1 for IN and 2 for OUT
+        entries = {1: 1, 2: 0}
+    else:
+        # TwinCAT states are 1 for out, then one per filter
+        entries = {}
+    config = []
+    for positioner in _blade_positioners(device):
+        value = positioner.state.get()
+        if entries:
+            config.append(entries.get(value, -1))
+        else:
+            config.append(value - 1 if value >= 1 else -1)
+    return tuple(config)
+
+
+def _move_blade(device, positioner, entry, timeout=None):
+    """Move one blade to a configuration entry."""
+    if isinstance(device, AttBase):
+        if entry:
+            return positioner.insert(timeout=timeout)
+        return positioner.remove(timeout=timeout)
+    # TwinCAT states are 1 for out, then one per filter
+    return positioner.move(entry + 1, timeout=timeout)
+
+
+def _group_by_motions(transmissions, motions):
+    """
+    Split configurations up by their number of blade motions.
+
+    Returns a list, indexed by the number of motions, of
+    ``(log_transmissions, indices)`` pairs sorted by transmission.
+    """
+    with np.errstate(divide='ignore'):
+        log_trans = np.log(transmissions)
+    order = np.lexsort((log_trans, motions))
+    counts = np.bincount(motions, minlength=int(motions.max()) + 1)
+    groups = []
+    for chunk in np.split(order, np.cumsum(counts)[:-1]):
+        groups.append((log_trans[chunk], chunk))
+    return groups
+
+
+def _motion_splits(total, limits):
+    """Yield the ways of sharing ``total`` motions between the devices."""
+    if len(limits) == 1:
+        if total <= limits[0]:
+            yield (total,)
+        return
+    for first in range(min(total, limits[0]) + 1):
+        for rest in _motion_splits(total - first, limits[1:]):
+            yield (first,) + rest
+
+
+def _search_motion_groups(groups, goal, tolerance):
+    """
+    Search the output of `_group_by_motions` for several devices.
+
+    Returns ``(error, log_transmission, motions, indices)`` for the closest
+    combination with the fewest motions that is within ``tolerance`` of
+    ``goal``, or for the closest combination overall if there is none.
+    Errors and tolerances are in log transmission.
+    """
+    limits = [len(device_groups) - 1 for device_groups in groups]
+    closest = None
+    for total in range(sum(limits) + 1):
+        best = None
+        for split in _motion_splits(total, limits):
+            chosen = [device_groups[count]
+                      for device_groups, count in zip(groups, split)]
+            if any(len(indices) == 0 for _, indices in chosen):
+                continue
+            found = _closest_combination(chosen, goal)
+            if best is None or found[0] < best[0]:
+                best = found
+        if best is None:
+            continue
+        best = (best[0], best[1], total, best[2])
+        if closest is None or best[0] < closest[0]:
+            closest = best
+        if best[0] <= tolerance:
+            return best
+    return closest
+
+
+def _closest_combination(chosen, goal):
+    """
+    Find the combination of one entry per device that is closest to goal.
+
+    The largest set of entries is searched with a binary search, and the
+    others are combined with each other up front.
+    """
+    largest = max(range(len(chosen)), key=lambda idx: len(chosen[idx][1]))
+    others = [idx for idx in range(len(chosen)) if idx != largest]
+    combined = np.zeros(1)
+    for idx in others:
+        combined = np.add.outer(combined, chosen[idx][0]).ravel()
+
+    values, indices = chosen[largest]
+    want = goal - combined
+    pos = np.searchsorted(values, want)
+    below = np.clip(pos - 1, 0, len(values) - 1)
+    above = np.clip(pos, 0, len(values) - 1)
+    use_above = np.abs(values[above] - want) < np.abs(values[below] - want)
+    match = np.where(use_above, above, below)
+    errors = np.abs(combined + values[match] - goal)
+    # Infinite errors only happen for fully blocking filters
+    errors = np.nan_to_num(errors, nan=np.inf)
+    flat = int(np.argmin(errors))
+
+    result = [None] * len(chosen)
+    result[largest] = int(indices[match[flat]])
+    if others:
+        shape = tuple(len(chosen[idx][1]) for idx in others)
+        for idx, pos in zip(others, np.unravel_index(flat, shape)):
+            result[idx] = int(chosen[idx][1][pos])
+    return (float(errors[flat]), float(combined[flat] + values[match[flat]]),
+            result)
@@ -1,5 +1,9 @@
+import functools
 import logging
+import threading
+import time
 
+import numpy as np
 from ophyd.device import Component as Cpt
 from ophyd.device import Device
 from ophyd.signal import AttributeSignal, EpicsSignal, EpicsSignalRO
@@ -12,7 +16,314 @@ from .signal import AvgSignal
 logger = logging.getLogger(__name__)
 
 
-class BeamStats(BaseInterface, Device):
+class SignalBuffer:
+    """
+    Record several signals into fixed-size columns to compare them.
+
+    Each signal's updates are stored with their EPICS timestamps in
+    preallocated NumPy arrays that act as ring buffers, so the memory used
+    never grows. The columns can then be lined up by timestamp with
+    :meth:`align` to compare values from the same pulse, for example with
+    :meth:`correlate` or :meth:`bin`.
+
+    Parameters
+    ----------
+    signals : dict or list of Signal
+        The signals to record, either as a dictionary of column name to
+        signal or a list of signals named by their attribute names.
+
+    size : int, optional
+        The number of updates to keep for each signal. Defaults to the
+        number that fits in ``max_bytes``.
+
+    max_bytes : int, optional
+        The memory budget for all of the columns, used if ``size`` is not
+        given. Defaults to 8 MB.
+    """
+
+    def __init__(self, signals, size=None, max_bytes=8 * 1024 ** 2):
+        if not isinstance(signals, dict):
+            signals = {sig.attr_name or sig.name: sig for sig in signals}
+        if not signals:
+            raise ValueError('Must provide at least one signal to buffer.')
+        self.signals = dict(signals)
+        self.names = list(self.signals)
+        # Each entry is a float64 value and a float64 timestamp
+        if size is None:
+            size = max_bytes // (16 * len(self.names))
+        if size < 1:
+            raise ValueError(f'Buffer size must be at least 1, not {size}')
+        self.size = int(size)
+        self._lock = threading.Lock()
+        self._values = np.empty((len(self.names), self.size))
+        self._times = np.empty((len(self.names), self.size))
+        self._counts = np.zeros(len(self.names), dtype=int)
+        self._cids = {}
+
+    @property
+    def nbytes(self):
+        """The memory used by the columns in bytes."""
+        return self._values.nbytes + self._times.nbytes
+
+    @property
+    def running(self):
+        """`True` if we are recording new values."""
+        return bool(self._cids)
+
+    def start(self):
+        """Start recording new values."""
+        for col, name in enumerate(self.names):
+            if name not in self._cids:
+                sig = self.signals[name]
+                self._cids[name] = sig.subscribe(
+                    functools.partial(self._add, col), run=False,
+                )
+
+    def stop(self):
+        """Stop recording new values."""
+        for name, cid in self._cids.items():
+            self.signals[name].unsubscribe(cid)
+        self._cids.clear()
+
+    def clear(self):
+        """Remove all of the recorded values."""
+        with self._lock:
+            self._counts[:] = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _add(self, col, *args, value, timestamp=None, **kwargs):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = np.nan
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            index = self._counts[col] % self.size
+            self._values[col, index] = value
+            self._times[col, index] = timestamp
+            self._counts[col] += 1
+
+    def column(self, name):
+        """
+        Get the recorded values of one signal.
+
+        Parameters
+        ----------
+        name : str
+            The column name.
+
+        Returns
+        -------
+        timestamps, values : numpy.ndarray
+            Copies of the recorded timestamps and values, oldest first.
+        """
+        col = self.names.index(name)
+        with self._lock:
+            count = self._counts[col]
+            if count <= self.size:
+                times = self._times[col, :count].copy()
+                values = self._values[col, :count].copy()
+            else:
+                index = count % self.size
+                times = np.roll(self._times[col], -index)
+                values = np.roll(self._values[col], -index)
+        if np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            times = times[order]
+            values = values[order]
+        return times, values
+
+    def align(self, reference=None, names=None, method='nearest',
+              tolerance=None):
+        """
+        Line up the recorded values by timestamp.
+
+        Parameters
+        ----------
+        reference : str, optional
+            The column whose timestamps are used for the rows. Defaults to
+            the first column.
+
+        names : list of str, optional
+            The columns to include. Defaults to all of them.
+
+        method : {'nearest', 'previous', 'exact'}, optional
+            How to pick the value from each column for each row: the
+            closest timestamp, the latest timestamp at or before the row,
+            or only matching timestamps. Defaults to 'nearest'.
+
+        tolerance : float, optional
+            The largest allowed time difference in seconds. Rows without
+            a value this close are NaN. Defaults to no limit, or 0 for
+            'exact'.
+
+        Returns
+        -------
+        aligned : dict
+            The row timestamps under 'timestamp' and an array of values
+            for each column name.
+        """
+        if method not in ('nearest', 'previous', 'exact'):
+            raise ValueError(f'Unknown alignment method {method}')
+        if method == 'exact' and tolerance is None:
+            tolerance = 0
+        if reference is None:
+            reference = self.names[0]
+        if names is None:
+            names = self.names
+        ref_times, ref_values = self.column(reference)
+        aligned = {'timestamp': ref_times}
+        for name in names:
+            if name == reference:
+                aligned[name] = ref_values
+                continue
+            times, values = self.column(name)
+            result = np.full(len(ref_times), np.nan)
+            if len(times):
+                if method == 'previous':
+                    index = np.searchsorted(times, ref_times, side='right') - 1
+                    valid = index >= 0
+                    index = np.clip(index, 0, None)
+                else:
+                    right = np.clip(np.searchsorted(times, ref_times),
+                                    0, len(times) - 1)
+                    left = np.clip(right - 1, 0, None)
+                    use_left = (np.abs(ref_times - times[left])
+                                <= np.abs(times[right] - ref_times))
+                    index = np.where(use_left, left, right)
+                    valid = np.ones(len(ref_times), dtype=bool)
+                if tolerance is not None:
+                    valid &= np.abs(ref_times - times[index]) <= tolerance
+                result[valid] = values[index[valid]]
+            aligned[name] = result
+        return aligned
+
+    def _pairs(self, x, y, **kwargs):
+        kwargs.setdefault('reference', x)
+        aligned = self.align(names=[x, y], **kwargs)
+        xvals, yvals = aligned[x], aligned[y]
+        keep = ~(np.isnan(xvals) | np.isnan(yvals))
+        return xvals[keep], yvals[keep]
+
+    def correlate(self, x, y, **kwargs):
+        """
+        Get the correlation coefficient between two columns.
+
+        Parameters
+        ----------
+        x, y : str
+            The column names.
+
+        **kwargs :
+            Passed to :meth:`align`. ``x`` is the default reference.
+
+        Returns
+        -------
+        coefficient : float
+            The Pearson correlation coefficient of the aligned rows, or
+            NaN if there are fewer than two.
+        """
+        xvals, yvals = self._pairs(x, y, **kwargs)
+        if len(xvals) < 2 or np.std(xvals) == 0 or np.std(yvals) == 0:
+            return np.nan
+        return float(np.corrcoef(xvals, yvals)[0, 1])
+
+    def bin(self, x, y, bins=10, **kwargs):
+        """
+        Get statistics of one column in bins of another.
+
+        For example, ``bin('ev', 'mj')`` gives the mean pulse energy at
+        each photon energy.
+
+        Parameters
+        ----------
+        x : str
+            The column to bin by.
+
+        y : str
+            The column to take statistics of.
+
+        bins : int or sequence of float, optional
+            The number of bins or the bin edges, as in `numpy.histogram`.
+
+        **kwargs :
+            Passed to :meth:`align`. ``x`` is the default reference.
+
+        Returns
+        -------
+        binned : dict
+            Arrays of bin 'edges' and 'centers', and the 'count', 'mean' and
+            'std' of ``y`` in each bin. Empty bins have NaN statistics.
+        """
+        xvals, yvals = self._pairs(x, y, **kwargs)
+        counts, edges = np.histogram(xvals, bins=bins)
+        nbins = len(edges) - 1
+        index = np.clip(np.searchsorted(edges, xvals, side='right') - 1,
+                        0, nbins - 1)
+        inside = (xvals >= edges[0]) & (xvals <= edges[-1])
+        index, yvals = index[inside], yvals[inside]
+        sums = np.bincount(index, weights=yvals, minlength=nbins)
+        sumsq = np.bincount(index, weights=yvals * yvals, minlength=nbins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums / counts
+            std = np.sqrt(np.clip(sumsq / counts - mean * mean, 0, None))
+        return dict(edges=edges, centers=(edges[:-1] + edges[1:]) / 2,
+                    count=counts, mean=mean, std=std)
+
+
+class BufferMixin:
+    """
+    Mixin for devices whose signals are often compared with each other.
+
+    Attributes
+    ----------
+    buffer_attrs : list of str, optional
+        The signals to record by default. If omitted, all of the device's
+        numeric read signals are used.
+    """
+
+    tab_whitelist = ['make_buffer']
+    buffer_attrs = None
+
+    def make_buffer(self, *attrs, start=True, **kwargs):
+        """
+        Make a `SignalBuffer` for comparing values of this device's signals.
+
+        Parameters
+        ----------
+        *attrs : str
+            The signals to record. Defaults to ``buffer_attrs``.
+
+        start : bool, optional
+            If `True`, the default, start recording right away.
+
+        **kwargs :
+            Passed to `SignalBuffer`, e.g. ``size`` or ``max_bytes``.
+
+        Returns
+        -------
+        buffer : SignalBuffer
+        """
+        if not attrs:
+            attrs = self.buffer_attrs
+        if attrs is None:
+            attrs = [attr for attr in self.read_attrs
+                     if not getattr(getattr(self, attr), 'as_string', False)]
+        buffer = SignalBuffer({attr: getattr(self, attr) for attr in attrs},
+                              **kwargs)
+        if start:
+            buffer.start()
+        return buffer
+
+
+class BeamStats(BufferMixin, BaseInterface, Device):
     mj = Cpt(EpicsSignalRO, 'GDET:FEE1:241:ENRC', kind='hinted',
              doc='Pulse energy [mJ]')
     ev = Cpt(EpicsSignalRO, 'BLD:SYS0:500:PHOTONENERGY', kind='normal',
@@ -26,6 +337,7 @@ class BeamStats(BaseInterface, Device):
     mj_buffersize = Cpt(AttributeSignal, 'mj_avg.averages', kind='config')
 
     tab_component_names = True
+    buffer_attrs = ['mj', 'ev', 'rate']
 
     def __init__(self, prefix='', name='beam_stats', **kwargs):
         super().__init__(prefix=prefix, name=name, **kwargs)
@@ -79,7 +391,7 @@ class BeamEnergyRequest(PVPositionerDone):
                          **kwargs)
 
 
-class LCLS(BaseInterface, Device):
+class LCLS(BufferMixin, BaseInterface, Device):
     """
     Object to query machine Lcls Linac status.
     """
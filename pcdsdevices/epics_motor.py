@@ -108,6 +108,8 @@ class EpicsMotorInterface(FltMvInterface, EpicsMotor):
         precision = self.user_readback.metadata['precision'] or 3
         description = get_status_value(status_info, 'description', 'value')
         units = get_status_value(status_info, 'user_setpoint', 'units')
+        preset = get_status_value(status_info, 'preset',
+                                  default_value='Unknown')
         dial = get_status_float(status_info, 'dial_position', 'value',
                                 precision=precision)
         user = get_status_float(status_info, 'position', precision=precision)
@@ -124,7 +126,7 @@ class EpicsMotorInterface(FltMvInterface, EpicsMotor):
 {name}
 Current position (user, dial): {user}, {dial} [{units}]
 User limits (low, high): {low:.{precision}f}, {high:.{precision}f} [{units}]
-Preset position: {self.presets.state()}
+Preset position: {preset}
 Limit Switch: {switch_limits}
 """
 
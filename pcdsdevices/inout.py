@@ -6,6 +6,7 @@ methods such as :meth:`~InOutPositioner.insert` or
 :meth:`~InOutPositioner.remove` and the ability to mark discrete states as in
 the beam or out of the beam.
 """
+import logging
 import math
 
 from ophyd.device import required_for_connection
@@ -16,6 +17,8 @@ from .state import (CombinedStateRecordPositioner, PVStatePositioner,
                     StatePositioner, StateRecordPositioner,
                     TwinCATStatePositioner)
 
+logger = logging.getLogger(__name__)
+
 
 class InOutPositioner(StatePositioner):
     """
@@ -58,6 +61,12 @@ class InOutPositioner(StatePositioner):
 
     tab_whitelist = ['inserted', 'removed', 'insert', 'remove', 'transmission']
 
+    # Per-state lookups, indexed by state value and built on first use
+    _state_tables_enum = None
+    _inserted_table = ()
+    _removed_table = ()
+    _transmission_table = ()
+
     def __init__(self, prefix, *, name, **kwargs):
         if self.__class__ is InOutPositioner:
             raise TypeError(('InOutPositioner must be subclassed with at '
@@ -74,6 +83,45 @@ class InOutPositioner(StatePositioner):
         self._trans_enum = {}
         self._extend_trans_enum(self.in_states, 0)
         self._extend_trans_enum(self.out_states, 1)
+        self._state_tables_enum = None
+
+    def _update_state_tables(self):
+        """
+        Precompute inserted, removed and transmission for every state.
+
+        The tables are indexed by state value so that the checks below only
+        need one read of the state signal and a list lookup.
+        """
+        self._state_tables_enum = self.states_enum
+        size = len(self.states_list)
+        self._inserted_table = self._make_state_table(self.in_states, size)
+        self._removed_table = self._make_state_table(self.out_states, size)
+        transmission = [math.nan] * size
+        for index, value in self._trans_enum.items():
+            transmission[index] = value
+        self._transmission_table = transmission
+
+    def _make_state_table(self, state_list, size):
+        table = [False] * size
+        for state in state_list:
+            try:
+                table[self.get_state(state).value] = True
+            except (ValueError, IndexError):
+                logger.debug('%s: ignoring unknown state %s',
+                             self.name, state)
+        return table
+
+    def _check_state_table(self, table_name, default, state=None):
+        """Look up the current or the given state in a state table."""
+        if state is None:
+            state = self.state.get()
+        index = self.get_state(state).value
+        if self._state_tables_enum is not self.states_enum:
+            self._update_state_tables()
+        try:
+            return getattr(self, table_name)[index]
+        except IndexError:
+            return default
 
     @property
     def inserted(self):
@@ -82,7 +130,7 @@ class InOutPositioner(StatePositioner):
 
     def check_inserted(self, state=None):
         """Query if a particular state counts as inserted."""
-        return self._pos_in_list(self.in_states, check_state=state)
+        return self._check_state_table('_inserted_table', False, state)
 
     @property
     def removed(self):
@@ -91,7 +139,7 @@ class InOutPositioner(StatePositioner):
 
     def check_removed(self, state=None):
         """Query if a particular state counts as removed."""
-        return self._pos_in_list(self.out_states, check_state=state)
+        return self._check_state_table('_removed_table', False, state)
 
     def insert(self, moved_cb=None, timeout=None, wait=False):
         """
@@ -128,10 +176,8 @@ class InOutPositioner(StatePositioner):
 
     def check_transmission(self, state=None):
         """Query the transition at a particular state."""
-        if state is None:
-            state = self.position
-        state_index = self.get_state(state).value
-        return self._trans_enum.get(state_index, math.nan)
+        return self._check_state_table('_transmission_table', math.nan,
+                                       state)
 
     def _extend_trans_enum(self, state_list, default):
         for state in state_list:
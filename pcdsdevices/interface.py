@@ -1,19 +1,25 @@
 """
 Module for defining bell-and-whistles movement features.
 """
+import atexit
+import bisect
 import functools
 import logging
 import numbers
+import os
 import re
-import signal
+import sqlite3
+import sys
 import time
 import typing
+from concurrent.futures import wait as wait_futures
 from contextlib import contextmanager
 from pathlib import Path
-from threading import Event
+from threading import Condition, Event, RLock, Thread
 from types import MethodType, SimpleNamespace
 from weakref import WeakSet
 
+import numpy as np
 import ophyd
 import yaml
 from bluesky.utils import ProgressBar
@@ -31,6 +37,11 @@ try:
 except ImportError:
     fcntl = None
 
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
 logger = logging.getLogger(__name__)
 engineering_mode = True
 
@@ -52,31 +63,52 @@ class _TabCompletionHelper:
 
     _includes: typing.Set[str]
     _regex: typing.Optional[typing.Pattern]
+    _matches: typing.Dict[str, bool]
+    _version: int
 
     def __init__(self):
         self._includes = set()
         self._regex = None
+        self._matches = {}
+        self._version = 0
         self.reset()
 
+    def _invalidate(self):
+        """Drop the cached regex and match index after an includes change."""
+        self._regex = None
+        self._matches = {}
+        self._version += 1
+
     def build_regex(self) -> typing.Pattern:
         """Update the regular expression based on the current includes."""
         self._regex = re.compile("|".join(sorted(self._includes)))
         return self._regex
 
+    def is_match(self, attr: str) -> bool:
+        """Check if an attribute is included, caching the result."""
+        try:
+            return self._matches[attr]
+        except KeyError:
+            if self._regex is None:
+                self.build_regex()
+            match = self._regex.fullmatch(attr) is not None
+            self._matches[attr] = match
+            return match
+
     def reset(self):
         """Reset the tab-completion settings."""
-        self._regex = None
         self._includes.clear()
+        self._invalidate()
 
     def add(self, attr: str):
         """Add an attribute to the include list."""
         self._includes.add(attr)
-        self._regex = None
+        self._invalidate()
 
     def remove(self, attr: str):
         """Remove an attribute from the include list."""
         self._includes.remove(attr)
-        self._regex = None
+        self._invalidate()
 
     def __repr__(self):
         return f'{self.__class__.__name__}(includes={self._includes})'
@@ -86,6 +118,9 @@ class TabCompletionHelperClass(_TabCompletionHelper):
     """
     Tab completion helper for the class itself.
 
+    The match index built here is shared by every instance that has not
+    customized its own includes.
+
     Parameters
     ----------
     cls : subclass of BaseInterface
@@ -110,7 +145,8 @@ class TabCompletionHelperClass(_TabCompletionHelper):
                     if getattr(parent, cpt_name).kind != Kind.omitted:
                         whitelist.append(cpt_name)
 
-        self._includes = set(whitelist)
+        # Update in place, instances may be sharing this set
+        self._includes.update(whitelist)
 
     def new_instance(self, instance) -> 'TabCompletionHelperInstance':
         """
@@ -128,6 +164,10 @@ class TabCompletionHelperInstance(_TabCompletionHelper):
     """
     Tab completion helper for one instance of a class.
 
+    Until :meth:`add` or :meth:`remove` is called, this uses the includes and
+    match index of `class_helper` directly. The includes are copied on the
+    first modification.
+
     Parameters
     ----------
     instance : object
@@ -140,6 +180,7 @@ class TabCompletionHelperInstance(_TabCompletionHelper):
     class_helper: TabCompletionHelperClass
     instance: 'BaseInterface'
     super_dir: typing.Callable[[], typing.List[str]]
+    _shared: bool
 
     def __init__(self, instance, class_helper):
         assert isinstance(instance, BaseInterface), 'Must mix in BaseInterface'
@@ -149,21 +190,45 @@ class TabCompletionHelperInstance(_TabCompletionHelper):
         self.super_dir = super(BaseInterface, instance).__dir__
         super().__init__()
 
+    @property
+    def _index(self) -> _TabCompletionHelper:
+        """The helper that holds the includes and match index in use."""
+        return self.class_helper if self._shared else self
+
+    def _copy_on_write(self):
+        """Stop sharing the class includes before a modification."""
+        if self._shared:
+            self._includes = set(self.class_helper._includes)
+            self._shared = False
+
     def reset(self):
         """Reset the attribute includes to that defined by the class."""
-        super().reset()
-        self._includes = set(self.class_helper._includes)
+        # Don't clear the includes, they may be the class helper's
+        self._includes = self.class_helper._includes
+        self._shared = True
+        self._invalidate()
+
+    def add(self, attr: str):
+        """Add an attribute to the include list."""
+        self._copy_on_write()
+        super().add(attr)
+
+    def remove(self, attr: str):
+        """Remove an attribute from the include list."""
+        self._copy_on_write()
+        super().remove(attr)
+
+    def build_regex(self) -> typing.Pattern:
+        """Update the regular expression based on the current includes."""
+        if self._shared:
+            self._regex = self.class_helper.build_regex()
+            return self._regex
+        return super().build_regex()
 
     def get_filtered_dir_list(self) -> typing.List[str]:
         """Get the dir list, filtered based on the whitelist."""
-        if self._regex is None:
-            self.build_regex()
-
-        return [
-            elem
-            for elem in self.super_dir()
-            if self._regex.fullmatch(elem)
-        ]
+        is_match = self._index.is_match
+        return [elem for elem in self.super_dir() if is_match(elem)]
 
     def get_dir(self) -> typing.List[str]:
         """Get the dir list based on the engineering mode settings."""
@@ -186,14 +251,23 @@ class BaseInterface:
     ----------
     tab_whitelist : list
         List of string regex to show in autocomplete for non-engineering mode.
+
+    status_timeout : float
+        Device-wide deadline in seconds for gathering the signal values shown
+        in the status display. Signals that do not respond in time are marked
+        as timed out rather than delaying the entire display.
     """
 
     tab_whitelist = (OphydObject_whitelist + BlueskyInterface_whitelist +
                      Device_whitelist + Signal_whitelist +
-                     Positioner_whitelist)
+                     Positioner_whitelist + ["watch"])
+
+    status_timeout = 1.0
 
     _class_tab: TabCompletionHelperClass
     _tab: TabCompletionHelperInstance
+    _status_cache: typing.Optional['StatusCache'] = None
+    _watch_ev: typing.Optional[Event] = None
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -327,6 +401,8 @@ class BaseInterface:
             units = status_info.get('units') or ''
             if units:
                 units = f' [{units}]'
+            if status_info.get('timed_out', False):
+                return [f'{name}: (timed out)']
             value_text = str(value)
             if '\n' in value_text:
                 # Multiline values (arrays) need special handling
@@ -349,12 +425,101 @@ class BaseInterface:
         info: dict
             Nested dictionary. Each level has keys name, kind, and is_device.
             If is_device is True, subdevice dictionaries may follow. Otherwise,
-            the only other key in the dictionary will be value.
+            the other keys in the dictionary will be value and units, and
+            timed_out will be set if the value was not read before the
+            ``status_timeout`` deadline.
         """
         def subdevice_filter(info):
             return bool(info['kind'] & Kind.normal)
 
-        return ophydobj_info(self, subdevice_filter=subdevice_filter)
+        if self._status_cache is not None:
+            values = self._status_cache.get_values(timeout=self.status_timeout)
+        else:
+            values = get_status_values(self, timeout=self.status_timeout)
+        return ophydobj_info(self, subdevice_filter=subdevice_filter,
+                             values=values)
+
+    def enable_status_cache(self, max_age=None):
+        """
+        Serve the status display from monitored values.
+
+        Subscribes once to every signal shown by :meth:`status_info` and keeps
+        the latest values in a :class:`StatusCache`. Repeated status prints
+        then only need to read signals that have not updated yet.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            If provided, cached values older than this many seconds are
+            re-read on the next status print. By default, monitored values
+            never go stale.
+        """
+        self.disable_status_cache()
+        self._status_cache = StatusCache(self, max_age=max_age)
+
+    def disable_status_cache(self):
+        """Remove the status cache and its subscriptions, if present."""
+        if self._status_cache is not None:
+            self._status_cache.clear()
+            self._status_cache = None
+
+    def watch(self, max_rate=10.0, file=None):
+        """
+        Shows a live-updating status display in the terminal.
+
+        The display is redrawn when one of the displayed values changes,
+        at most ``max_rate`` times per second, and only the lines that
+        changed are rewritten.
+
+        This method ends cleanly at a ctrl+c or after a call to
+        :meth:`end_watch`, which may be useful when this is called in a
+        background thread.
+
+        Parameters
+        ----------
+        max_rate : float, optional
+            The maximum number of redraws per second.
+
+        file : file-like, optional
+            Where to write the display. Defaults to `sys.stdout`.
+        """
+        file = file or sys.stdout
+        period = 1 / max_rate
+        own_cache = self._status_cache is None
+        if own_cache:
+            self.enable_status_cache()
+        cache = self._status_cache
+        self._watch_ev = Event()
+        lines = []
+        try:
+            while not self._watch_ev.is_set():
+                last_draw = time.monotonic()
+                cache.updated.clear()
+                new_lines = self.format_status_info(
+                    self.status_info()).split('\n')
+                file.write(redraw_lines(lines, new_lines))
+                file.flush()
+                lines = new_lines
+                # Sleep until something changes, but not more than max_rate
+                if not self._watch_ev.is_set():
+                    # end_watch sets this too, after setting _watch_ev
+                    cache.updated.wait()
+                self._watch_ev.wait(max(0, period - (time.monotonic()
+                                                     - last_draw)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._watch_ev = None
+            if own_cache:
+                self.disable_status_cache()
+
+    def end_watch(self):
+        """Stop a :meth:`watch` that is running in another thread."""
+        if self._watch_ev is not None:
+            self._watch_ev.set()
+            if self._status_cache is not None:
+                # Wake up the watch loop
+                self._status_cache.updated.set()
 
 
 def get_name(obj, default):
@@ -384,6 +549,298 @@ def get_value(signal):
     return None
 
 
+def get_values(signals, timeout=None):
+    """
+    Read many signals concurrently under a single shared deadline.
+
+    Parameters
+    ----------
+    signals : iterable of Signal
+        The signals to read.
+
+    timeout : float, optional
+        The total time in seconds to wait for all of the reads. Any reads
+        that are still pending after this will be left out of the result.
+
+    Returns
+    -------
+    values : dict
+        Mapping of signal to value for every signal that was read in time.
+        Values are `None` for disconnected or errored signals, just as with
+        :func:`get_value`.
+    """
+    values = {}
+    pending = {}
+    for sig in signals:
+        if sig in values or sig in pending:
+            continue
+        try:
+            connected = sig.connected
+        except Exception:
+            connected = False
+        if not connected:
+            # No need for a round trip, this can't give us a value
+            values[sig] = None
+            continue
+        pending[sig] = utils.get_read_executor().submit(get_value, sig)
+
+    if pending:
+        done, not_done = wait_futures(pending.values(), timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        for sig, future in pending.items():
+            if future in done:
+                values[sig] = future.result()
+    return values
+
+
+def get_status_values(obj, timeout=None):
+    """
+    Concurrently read every signal that the status display would show.
+
+    Parameters
+    ----------
+    obj : OphydObject
+        The signal or device to gather values for.
+
+    timeout : float, optional
+        The device-wide deadline for all of the reads.
+
+    Returns
+    -------
+    values : dict
+        See :func:`get_values`. Suitable as the ``values`` argument to
+        :func:`ophydobj_info`.
+    """
+    return get_values(status_signals(obj), timeout=timeout)
+
+
+def status_signals(obj, devices=None):
+    """
+    Get all the signals that :func:`ophydobj_info` will read values from.
+
+    Parameters
+    ----------
+    obj : OphydObject
+        The signal or device to inspect.
+
+    devices : set, optional
+        Devices that have already been visited.
+
+    Returns
+    -------
+    signals : list of Signal
+    """
+    if isinstance(obj, Signal):
+        return [obj]
+    elif not isinstance(obj, Device):
+        return []
+    if devices is None:
+        devices = set()
+    if obj in devices:
+        return []
+    devices.add(obj)
+    signals = []
+    for _, cpt in status_components(obj):
+        signals.extend(status_signals(cpt, devices=devices))
+    return signals
+
+
+def status_components(device):
+    """
+    Iterate over the components of a device that belong in the status display.
+
+    Parameters
+    ----------
+    device : Device
+        The device to inspect.
+
+    Yields
+    ------
+    cpt_name, cpt : str, OphydObject
+        The attribute name and the instantiated component.
+    """
+    for cpt_name, cpt_desc in device._sig_attrs.items():
+        # Skip lazy signals outright in all cases
+        # Usually these are lazy because they take too long to getattr
+        if cpt_desc.lazy:
+            continue
+        # Skip attribute signals
+        # Indeterminate get times, no real connected bool, etc.
+        if issubclass(cpt_desc.cls, AttributeSignal):
+            continue
+        # Skip not implemented signals
+        # They never have interesting information
+        if issubclass(cpt_desc.cls, NotImplementedSignal):
+            continue
+        try:
+            cpt = getattr(device, cpt_name)
+        except AttributeError:
+            # Why are we ever in this block?
+            logger.debug(f'Getattr {device.name}.{cpt_name} failed.',
+                         exc_info=True)
+            continue
+        yield cpt_name, cpt
+
+
+class StatusCache:
+    """
+    Monitor-backed table of the values shown in a device's status display.
+
+    Parameters
+    ----------
+    device : OphydObject
+        The device to cache status values for.
+
+    max_age : float, optional
+        Values received more than this many seconds ago are considered
+        stale and are re-read. If omitted, values are only read when no
+        monitor update has arrived yet.
+
+    Attributes
+    ----------
+    table : dict
+        Mapping of signal to ``(value, timestamp)``, where timestamp is the
+        local time at which the value was received.
+
+    updated : threading.Event
+        Set every time a monitor update changes a value.
+    """
+
+    def __init__(self, device, max_age=None):
+        self.device = device
+        self.max_age = max_age
+        self.table = {}
+        self.updated = Event()
+        self.signals = list(dict.fromkeys(status_signals(device)))
+        self._cids = {}
+        for sig in self.signals:
+            try:
+                self._cids[sig] = sig.subscribe(self._value_update, run=False)
+            except Exception:
+                logger.debug('Unable to subscribe to %s for status caching',
+                             sig.name, exc_info=True)
+
+    def _value_update(self, *args, value, obj, **kwargs):
+        """Store a new monitored value."""
+        try:
+            old_value, _ = self.table[obj]
+        except KeyError:
+            changed = True
+        else:
+            changed = not _values_equal(old_value, value)
+        self.table[obj] = (value, time.monotonic())
+        if changed:
+            self.updated.set()
+
+    def stale_signals(self):
+        """Get the subscribed signals that need to be read again."""
+        stale = []
+        now = time.monotonic()
+        for sig in self.signals:
+            if sig not in self._cids:
+                # Not monitored, always needs a read
+                stale.append(sig)
+                continue
+            try:
+                _, timestamp = self.table[sig]
+            except KeyError:
+                stale.append(sig)
+                continue
+            if self.max_age is not None and now - timestamp > self.max_age:
+                stale.append(sig)
+        return stale
+
+    def get_values(self, timeout=None):
+        """
+        Get values for the status display, only reading stale entries.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Deadline for refreshing the stale entries.
+
+        Returns
+        -------
+        values : dict
+            See :func:`get_values`.
+        """
+        refreshed = get_values(self.stale_signals(), timeout=timeout)
+        now = time.monotonic()
+        for sig, value in refreshed.items():
+            if value is not None:
+                self.table[sig] = (value, now)
+        values = {}
+        for sig in self.signals:
+            if sig in refreshed:
+                values[sig] = refreshed[sig]
+            elif sig in self.table:
+                try:
+                    connected = sig.connected
+                except Exception:
+                    connected = False
+                # Match get_value: disconnected signals have no value
+                values[sig] = self.table[sig][0] if connected else None
+        return values
+
+    def clear(self):
+        """Unsubscribe from all signals and empty the table."""
+        for sig, cid in self._cids.items():
+            try:
+                sig.unsubscribe(cid)
+            except Exception:
+                logger.debug('Unable to unsubscribe from %s', sig.name,
+                             exc_info=True)
+        self._cids.clear()
+        self.table.clear()
+        self.signals.clear()
+
+
+def _values_equal(old_value, new_value):
+    """Compare two signal values, including arrays."""
+    try:
+        return bool(np.array_equal(old_value, new_value))
+    except Exception:
+        return False
+
+
+def redraw_lines(old_lines, new_lines):
+    """
+    Get the terminal text that turns one rendering into another.
+
+    Assumes the cursor sits at the start of the line just below the old
+    rendering. Only lines that differ are rewritten, unless the number of
+    lines changed, in which case the old rendering is cleared and the new
+    rendering is drawn in full.
+
+    Parameters
+    ----------
+    old_lines : list of str
+        The lines that are currently on screen.
+
+    new_lines : list of str
+        The lines that should be on screen.
+
+    Returns
+    -------
+    text : str
+        Text including ANSI escape codes to write to the terminal.
+    """
+    if len(old_lines) != len(new_lines):
+        text = ''
+        if old_lines:
+            # Go to the top of the old rendering and clear to the end
+            text += f'\x1b[{len(old_lines)}A\r\x1b[J'
+        return text + ''.join(line + '\n' for line in new_lines)
+    text = []
+    total = len(new_lines)
+    for num, (old, new) in enumerate(zip(old_lines, new_lines)):
+        if old != new:
+            up = total - num
+            text.append(f'\x1b[{up}A\r\x1b[2K{new}\x1b[{up}B\r')
+    return ''.join(text)
+
+
 def get_units(signal):
     attrs = ('derived_units', 'units', 'egu')
     for attr in attrs:
@@ -395,19 +852,19 @@ def get_units(signal):
             ...
 
 
-def ophydobj_info(obj, subdevice_filter=None, devices=None):
+def ophydobj_info(obj, subdevice_filter=None, devices=None, values=None):
     if isinstance(obj, Signal):
-        return signal_info(obj)
+        return signal_info(obj, values=values)
     elif isinstance(obj, Device):
         return device_info(obj, subdevice_filter=subdevice_filter,
-                           devices=devices)
+                           devices=devices, values=values)
     elif isinstance(obj, PositionerBase):
         return positionerbase_info(obj)
     else:
         return {}
 
 
-def device_info(device, subdevice_filter=None, devices=None):
+def device_info(device, subdevice_filter=None, devices=None, values=None):
     if devices is None:
         devices = set()
     name = get_name(device, default='device')
@@ -416,15 +873,12 @@ def device_info(device, subdevice_filter=None, devices=None):
 
     try:
         # Show the current preset state if we have one
-        # This should be the first key in the ordered dict
         has_presets = device.presets.has_presets
     except AttributeError:
         has_presets = False
     if has_presets:
-        try:
-            info['preset'] = device.presets.state()
-        except Exception:
-            info['preset'] = 'ERROR'
+        # This should be the first key in the ordered dict
+        info['preset'] = None
 
     try:
         # Extra key for positioners
@@ -443,6 +897,16 @@ def device_info(device, subdevice_filter=None, devices=None):
         except Exception:
             ...
 
+    if has_presets:
+        # Reuse the position we just read rather than reading it again
+        position = info.get('position')
+        if not isinstance(position, numbers.Real):
+            position = None
+        try:
+            info['preset'] = device.presets.state(position=position)
+        except Exception:
+            info['preset'] = 'ERROR'
+
     try:
         # Best-effort try at getting the units
         info['units'] = get_units(device)
@@ -451,28 +915,9 @@ def device_info(device, subdevice_filter=None, devices=None):
 
     if device not in devices:
         devices.add(device)
-        for cpt_name, cpt_desc in device._sig_attrs.items():
-            # Skip lazy signals outright in all cases
-            # Usually these are lazy because they take too long to getattr
-            if cpt_desc.lazy:
-                continue
-            # Skip attribute signals
-            # Indeterminate get times, no real connected bool, etc.
-            if issubclass(cpt_desc.cls, AttributeSignal):
-                continue
-            # Skip not implemented signals
-            # They never have interesting information
-            if issubclass(cpt_desc.cls, NotImplementedSignal):
-                continue
-            try:
-                cpt = getattr(device, cpt_name)
-            except AttributeError:
-                # Why are we ever in this block?
-                logger.debug(f'Getattr {name}.{cpt_name} failed.',
-                             exc_info=True)
-                continue
+        for cpt_name, cpt in status_components(device):
             cpt_info = ophydobj_info(cpt, subdevice_filter=subdevice_filter,
-                                     devices=devices)
+                                     devices=devices, values=values)
             if 'position' in info:
                 # Drop some potential duplicate keys for positioners
                 try:
@@ -488,13 +933,20 @@ def device_info(device, subdevice_filter=None, devices=None):
     return info
 
 
-def signal_info(signal):
+def signal_info(signal, values=None):
     name = get_name(signal, default='signal')
     kind = get_kind(signal)
-    value = get_value(signal)
     units = get_units(signal)
-    return dict(name=name, kind=kind, is_device=False, value=value,
+    info = dict(name=name, kind=kind, is_device=False, value=None,
                 units=units)
+    if values is None:
+        info['value'] = get_value(signal)
+    elif signal in values:
+        info['value'] = values[signal]
+    else:
+        # This signal missed the deadline in get_values
+        info['timed_out'] = True
+    return info
 
 
 def positionerbase_info(positioner):
@@ -846,18 +1298,682 @@ def setup_preset_paths(**paths):
     Parameters
     ----------
     **paths : str keyword args
-        A mapping from type of preset to destination path. These will be
-        directories that contain the yaml files that define the preset
-        positions.
+        A mapping from type of preset to destination path. These will
+        normally be directories that contain the yaml files that define the
+        preset positions. A path to a SQLite database file, ending in
+        ``.db``, ``.sqlite`` or ``.sqlite3``, selects
+        :class:`SqlitePresetStore` for that preset type instead.
     """
 
     Presets._paths = {}
     for k, v in paths.items():
         Presets._paths[k] = Path(v)
+    # Scan each directory once up front for the bulk sync below
+    for path in Presets._paths.values():
+        if not is_sqlite_preset_path(path):
+            preset_index.scan(path)
     for preset in Presets._registry:
         preset.sync()
 
 
+# Use the libyaml bindings if available, they are much faster
+_YamlLoader = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+
+
+class PresetIndex:
+    """
+    Shared cache of preset file listings and contents.
+
+    Each preset directory is listed in one pass, so devices without a preset
+    file do not need to touch the filesystem at all. Parsed file contents are
+    kept keyed by ``(path, mtime, size)`` and are only parsed again if the
+    file has changed.
+
+    One instance, ``preset_index``, is shared by all :class:`Presets`.
+
+    Parameters
+    ----------
+    scan_max_age : float, optional
+        How old a directory listing can be, in seconds, before it is redone
+        to look for newly created files.
+    """
+
+    # Files modified this recently may change again without a visible
+    # change in mtime on coarse filesystems, so they are never cached.
+    racy_window = 2.0
+
+    def __init__(self, scan_max_age=1.0):
+        self.scan_max_age = scan_max_age
+        self._lock = RLock()
+        self._scans = {}
+        self._contents = {}
+
+    def clear(self):
+        """Forget all listings and parsed contents."""
+        with self._lock:
+            self._scans.clear()
+            self._contents.clear()
+
+    def scan(self, directory):
+        """
+        List the preset files in a directory.
+
+        Parameters
+        ----------
+        directory : Path
+            The preset directory to scan.
+
+        Returns
+        -------
+        filenames : set of str
+            The names of the yaml files in the directory.
+        """
+        filenames = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.yml'):
+                        filenames.add(entry.name)
+        except FileNotFoundError:
+            logger.debug('Preset directory %s does not exist', directory)
+        with self._lock:
+            self._scans[Path(directory)] = (time.monotonic(), filenames)
+        return filenames
+
+    def exists(self, path):
+        """
+        Check if a preset file exists using the directory listing.
+
+        Negative results may be up to ``scan_max_age`` seconds old.
+        """
+        path = Path(path)
+        with self._lock:
+            try:
+                timestamp, filenames = self._scans[path.parent]
+            except KeyError:
+                filenames = self.scan(path.parent)
+            else:
+                if (path.name not in filenames
+                        and time.monotonic() - timestamp > self.scan_max_age):
+                    filenames = self.scan(path.parent)
+            return path.name in filenames
+
+    def discard(self, path):
+        """Note that we changed a file so that it gets read again."""
+        path = Path(path)
+        with self._lock:
+            self._contents.pop(path, None)
+            try:
+                self._scans[path.parent][1].add(path.name)
+            except KeyError:
+                pass
+
+    def load(self, path, fd):
+        """
+        Get the parsed contents of an open preset file.
+
+        Parameters
+        ----------
+        path : Path
+            The path of the file, used as the cache key.
+
+        fd : file
+            The open file, which should already be locked by the caller.
+
+        Returns
+        -------
+        data : dict
+            The parsed contents. This is shared and should not be modified.
+        """
+        path = Path(path)
+        stat = os.fstat(fd.fileno())
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            try:
+                cached_key, data = self._contents[path]
+            except KeyError:
+                pass
+            else:
+                if cached_key == key:
+                    return data
+        fd.seek(0)
+        data = yaml.load(fd, Loader=_YamlLoader) or {}
+        if time.time() - stat.st_mtime > self.racy_window:
+            with self._lock:
+                self._contents[path] = (key, data)
+        return data
+
+
+preset_index = PresetIndex()
+
+
+def flock_with_timeout(fd, timeout, min_delay=0.001, max_delay=0.1):
+    """
+    Get an exclusive lock on a file, retrying until a timeout.
+
+    Non-blocking attempts are repeated with an exponential backoff, so this
+    works from any thread, unlike a signal-based timeout.
+
+    Parameters
+    ----------
+    fd : file
+        The open file to lock.
+
+    timeout : float
+        The time in seconds to keep trying.
+
+    min_delay, max_delay : float, optional
+        The range of sleep times between attempts.
+
+    Raises
+    ------
+    BlockingIOError
+        If we cannot acquire the file lock in time.
+    """
+    deadline = time.monotonic() + timeout
+    delay = min_delay
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+
+class PresetWriter:
+    """
+    Background thread that saves preset updates.
+
+    Updates that are queued for the same preset file while an earlier save is
+    in progress are merged, so the file is only read and written once for
+    all of them. One instance, ``preset_writer``, is shared by all
+    :class:`Presets`.
+    """
+
+    def __init__(self):
+        self._cond = Condition()
+        self._pending = {}
+        self._inflight = None
+        self._thread = None
+
+    def submit(self, presets, preset_type, update):
+        """
+        Queue an update to be saved.
+
+        Parameters
+        ----------
+        presets : Presets
+            The presets object that owns the file.
+
+        preset_type : str
+            The preset type to save to.
+
+        update : dict
+            Keyword arguments for :meth:`Presets._update`.
+        """
+        with self._cond:
+            self._pending.setdefault((presets, preset_type), []).append(update)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, daemon=True,
+                                      name='pcdsdevices_preset_writer')
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending_updates(self, presets):
+        """
+        Get the updates for a presets object that are not saved yet.
+
+        Returns
+        -------
+        updates : list of (str, dict)
+            The preset types and updates, in the order they were submitted.
+        """
+        updates = []
+        with self._cond:
+            batches = list(self._pending.items())
+            if self._inflight is not None:
+                batches.insert(0, self._inflight)
+        for (owner, preset_type), batch in batches:
+            if owner is presets:
+                updates.extend((preset_type, update) for update in batch)
+        return updates
+
+    def flush(self, timeout=None):
+        """
+        Wait for all queued updates to be saved.
+
+        Returns
+        -------
+        done : bool
+            `False` if the timeout expired first.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and self._inflight is None,
+                timeout=timeout,
+            )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._pending, timeout=1):
+                    # Idle, let the thread exit
+                    self._thread = None
+                    return
+                key = next(iter(self._pending))
+                self._inflight = (key, self._pending.pop(key))
+            presets, preset_type = key
+            try:
+                presets._save(preset_type, self._inflight[1])
+            except Exception:
+                logger.exception('Error saving %s presets', presets.name)
+            try:
+                presets.sync()
+            except Exception:
+                logger.exception('Error syncing %s presets', presets.name)
+            with self._cond:
+                self._inflight = None
+                self._cond.notify_all()
+
+
+preset_writer = PresetWriter()
+atexit.register(preset_writer.flush, timeout=10)
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def is_sqlite_preset_path(path):
+    """Returns `True` if a preset path selects :class:`SqlitePresetStore`."""
+    return Path(path).suffix in SQLITE_SUFFIXES
+
+
+class SqlitePresetStore:
+    """
+    Preset storage for all devices in a single SQLite database.
+
+    Current values and history are kept in separate tables, so each update
+    is a constant amount of work and loading the current presets never
+    touches the history. The history can be trimmed with :meth:`compact`
+    and the contents can be written out in the usual yaml layout with
+    :meth:`export`.
+
+    Parameters
+    ----------
+    path : Path
+        The database file. It will be created if it does not exist.
+
+    timeout : float, optional
+        How long to wait for another writer to release the database.
+    """
+
+    def __init__(self, path, timeout=1.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS presets ('
+                'device TEXT, name TEXT, value REAL, active INTEGER, '
+                'PRIMARY KEY (device, name))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS history ('
+                'device TEXT, name TEXT, timestamp TEXT, entry TEXT, '
+                'PRIMARY KEY (device, name, timestamp))'
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection and run one transaction with it."""
+        conn = sqlite3.connect(str(self.path), timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, device):
+        """
+        Get the current presets for a device, without any history.
+
+        Returns
+        -------
+        data : dict
+            Mapping of preset name to a dict with keys value and active.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT name, value, active FROM presets WHERE device = ? '
+                'ORDER BY rowid', (device,)
+            ).fetchall()
+        return {name: {'value': value, 'active': bool(active)}
+                for name, value, active in rows}
+
+    def history(self, device, name):
+        """Get the history of one preset as an ordered dict."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT timestamp, entry FROM history '
+                'WHERE device = ? AND name = ? ORDER BY rowid',
+                (device, name)
+            ).fetchall()
+        return dict(rows)
+
+    def update(self, device, name, value=None, comment=None, active=True):
+        """
+        Update one preset, matching the yaml behavior of `Presets._update`.
+
+        Raises
+        ------
+        KeyError
+            If only a comment or active state is given for a preset that
+            does not exist.
+        """
+        with self._connect() as conn:
+            if value is None:
+                row = conn.execute(
+                    'SELECT value FROM presets WHERE device = ? AND name = ?',
+                    (device, name)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(name)
+                if comment is not None:
+                    value = row[0]
+            if value is not None:
+                ts = time.strftime('%d %b %Y %H:%M:%S')
+                if comment:
+                    comment = ' ' + comment
+                else:
+                    comment = ''
+                conn.execute(
+                    'INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?)',
+                    (device, name, ts, '{:10.4f}{}'.format(value, comment))
+                )
+                conn.execute(
+                    'INSERT INTO presets VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (device, name) DO UPDATE '
+                    'SET value = excluded.value, active = excluded.active',
+                    (device, name, value, bool(active))
+                )
+            else:
+                conn.execute(
+                    'UPDATE presets SET active = ? '
+                    'WHERE device = ? AND name = ?',
+                    (bool(active), device, name)
+                )
+
+    def devices(self):
+        """Get the names of all devices with stored presets."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT DISTINCT device FROM presets ORDER BY device'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def compact(self, keep=1):
+        """
+        Trim the preset history and shrink the database file.
+
+        Parameters
+        ----------
+        keep : int, optional
+            The number of most recent history entries to keep per preset.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                'DELETE FROM history WHERE rowid NOT IN ('
+                'SELECT rowid FROM ('
+                'SELECT rowid, ROW_NUMBER() OVER ('
+                'PARTITION BY device, name ORDER BY rowid DESC) AS num '
+                'FROM history) WHERE num <= ?)', (keep,)
+            )
+        conn = sqlite3.connect(str(self.path), timeout=self.timeout)
+        try:
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    def export(self, directory, devices=None):
+        """
+        Write presets out as yaml files, one per device.
+
+        The files use the same layout as the yaml preset directories, so the
+        directory can be passed to :func:`setup_preset_paths`.
+
+        Parameters
+        ----------
+        directory : Path
+            Where to write the ``<device>.yml`` files.
+
+        devices : list of str, optional
+            The devices to export. Defaults to all devices in the database.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for device in devices or self.devices():
+            data = self.load(device)
+            for name, info in data.items():
+                info['history'] = self.history(device, name)
+            path = directory / (device + '.yml')
+            with open(path, 'w') as f:
+                yaml.dump(data, f, default_flow_style=False)
+            preset_index.discard(path)
+
+
+_sqlite_stores = {}
+
+
+def get_sqlite_preset_store(path):
+    """Get the shared :class:`SqlitePresetStore` for a database path."""
+    path = Path(path)
+    try:
+        return _sqlite_stores[path]
+    except KeyError:
+        store = _sqlite_stores[path] = SqlitePresetStore(path)
+        return store
+
+
+class PresetWatcher:
+    """
+    Background thread that synchronizes presets when their files change.
+
+    Watches every directory passed to :func:`setup_preset_paths`, using
+    inotify if the optional ``inotify_simple`` package is installed and a
+    cheap mtime poll of the directory listings otherwise. Only the
+    :class:`Presets` whose files changed are synchronized.
+
+    Parameters
+    ----------
+    poll_interval : float, optional
+        Time in seconds between checks for changes.
+
+    use_inotify : bool, optional
+        Set to `False` to use polling even if inotify is available.
+    """
+
+    def __init__(self, poll_interval=1.0, use_inotify=True):
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and inotify_simple is not None
+        self._stop_ev = Event()
+        self._thread = None
+        self._snapshot = None
+        self._inotify = None
+        self._watches = {}
+
+    @property
+    def running(self):
+        """`True` if the background thread is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start watching in a background thread."""
+        if self.running:
+            return
+        self._stop_ev.clear()
+        self._snapshot = None
+        if self.use_inotify:
+            self._inotify = inotify_simple.INotify()
+            self._watches = {}
+        self._thread = Thread(target=self._run, daemon=True,
+                              name='pcdsdevices_preset_watcher')
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for it to exit."""
+        self._stop_ev.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _run(self):
+        while not self._stop_ev.is_set():
+            try:
+                if self._inotify is not None:
+                    changed = self._read_inotify()
+                else:
+                    changed = self._poll()
+                    self._stop_ev.wait(self.poll_interval)
+                if changed:
+                    sync_changed_presets(changed)
+            except Exception:
+                logger.exception('Error in preset watcher')
+                self._stop_ev.wait(self.poll_interval)
+
+    @staticmethod
+    def _targets():
+        """Get the yaml preset directories and SQLite files to watch."""
+        directories = set()
+        databases = set()
+        for path in Presets._paths.values():
+            if is_sqlite_preset_path(path):
+                databases.add(path)
+            else:
+                directories.add(path)
+        return directories, databases
+
+    def _poll(self):
+        """Compare preset file mtimes and sizes with the last poll."""
+        directories, databases = self._targets()
+        snapshot = {}
+        for directory in directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.yml'):
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (stat.st_mtime_ns,
+                                                          stat.st_size)
+            except FileNotFoundError:
+                pass
+        for database in databases:
+            try:
+                stat = os.stat(database)
+            except FileNotFoundError:
+                continue
+            snapshot[database] = (stat.st_mtime_ns, stat.st_size)
+        old_snapshot = self._snapshot
+        self._snapshot = snapshot
+        if old_snapshot is None:
+            return set()
+        return {
+            path for path in set(snapshot) | set(old_snapshot)
+            if snapshot.get(path) != old_snapshot.get(path)
+        }
+
+    def _read_inotify(self):
+        """Update the inotify watches and return the changed files."""
+        flags = inotify_simple.flags
+        mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM
+                | flags.CREATE | flags.DELETE)
+        yaml_directories, databases = self._targets()
+        directories = yaml_directories | {path.parent for path in databases}
+        for wd, directory in list(self._watches.items()):
+            if directory not in directories:
+                del self._watches[wd]
+                try:
+                    self._inotify.rm_watch(wd)
+                except OSError:
+                    pass
+        watched = set(self._watches.values())
+        for directory in directories - watched:
+            try:
+                wd = self._inotify.add_watch(directory, mask)
+            except OSError:
+                logger.debug('Unable to watch %s', directory, exc_info=True)
+                continue
+            self._watches[wd] = directory
+        changed = set()
+        events = self._inotify.read(timeout=int(self.poll_interval * 1000))
+        for event in events:
+            try:
+                path = self._watches[event.wd] / event.name
+            except KeyError:
+                continue
+            if path in databases or (path.suffix == '.yml'
+                                     and path.parent in yaml_directories):
+                changed.add(path)
+        return changed
+
+
+def sync_changed_presets(paths):
+    """
+    Synchronize only the :class:`Presets` that use any of the given files.
+
+    Parameters
+    ----------
+    paths : iterable of Path
+        Preset files that have changed.
+    """
+    paths = {Path(path) for path in paths}
+    for directory in {path.parent for path in paths
+                      if not is_sqlite_preset_path(path)}:
+        preset_index.scan(directory)
+    for preset in list(Presets._registry):
+        for preset_type in preset._paths:
+            if preset._path(preset_type) in paths:
+                preset.sync()
+                break
+
+
+preset_watcher = None
+
+
+def start_preset_watcher(poll_interval=1.0, use_inotify=True):
+    """
+    Automatically synchronize presets when the preset files change.
+
+    This lets sessions see presets saved by other users without calling
+    :meth:`Presets.sync`. See :class:`PresetWatcher`.
+
+    Parameters
+    ----------
+    poll_interval : float, optional
+        Time in seconds between checks for changes.
+
+    use_inotify : bool, optional
+        Set to `False` to use polling even if inotify is available.
+    """
+    global preset_watcher
+    stop_preset_watcher()
+    preset_watcher = PresetWatcher(poll_interval=poll_interval,
+                                   use_inotify=use_inotify)
+    preset_watcher.start()
+
+
+def stop_preset_watcher():
+    """Stop the watcher started by :func:`start_preset_watcher`."""
+    global preset_watcher
+    if preset_watcher is not None:
+        preset_watcher.stop()
+        preset_watcher = None
+
+
 class Presets:
     """
     Manager for device preset positions.
@@ -884,27 +2000,60 @@ class Presets:
 
     _registry = WeakSet()
     _paths = {}
+    # How long a waiting update waits for queued background writes
+    flush_timeout = 5.0
 
     def __init__(self, device):
         self._device = device
+        self._cache = {}
         self._methods = []
+        self._method_types = []
+        self._active = {}
+        self._state_values = []
+        self._state_names = []
+        self.positions = SimpleNamespace()
         self._fd = None
+        self._thread_lock = RLock()
         self._registry.add(self)
         self.name = device.name + '_presets'
         self.sync()
 
     def _path(self, preset_type):
         """Utility function to get the preset file :class:`~pathlib.Path`."""
-        path = self._paths[preset_type] / (self._device.name + '.yml')
+        path = self._paths[preset_type]
+        if not is_sqlite_preset_path(path):
+            path = path / (self._device.name + '.yml')
         logger.debug('select presets path %s', path)
         return path
 
+    def _store(self, preset_type):
+        """
+        Utility function to get the :class:`SqlitePresetStore` for a type.
+
+        Returns `None` for preset types that use yaml files.
+        """
+        path = self._paths[preset_type]
+        if is_sqlite_preset_path(path):
+            return get_sqlite_preset_store(path)
+        return None
+
     def _read(self, preset_type):
         """Utility function to get a particular preset's datum dictionary."""
         logger.debug('read presets for %s', self._device.name)
         with self._file_open_rlock(preset_type) as f:
             f.seek(0)
-            return yaml.full_load(f) or {}
+            return yaml.load(f, Loader=_YamlLoader) or {}
+
+    def _load(self, preset_type):
+        """
+        Utility function to get a preset's datum dictionary for the cache.
+
+        Unlike :meth:`._read`, this returns the shared copy from
+        `preset_index`, which is only parsed again if the file changed.
+        """
+        logger.debug('load presets for %s', self._device.name)
+        with self._file_open_rlock(preset_type) as f:
+            return preset_index.load(self._path(preset_type), f)
 
     def _write(self, preset_type, data):
         """
@@ -915,6 +2064,7 @@ class Presets:
             f.seek(0)
             yaml.dump(data, f, default_flow_style=False)
             f.truncate()
+        preset_index.discard(self._path(preset_type))
 
     @contextmanager
     def _file_open_rlock(self, preset_type, timeout=1.0):
@@ -922,12 +2072,16 @@ class Presets:
         File locking context manager for this object.
 
         Works like threading.Rlock in that you can acquire it multiple times
-        safely.
+        safely from the same thread. Other threads wait for their turn.
+        This does not rely on signals, so it can be used from any thread.
 
         Parameters
         ----------
-        fd : file
-            The file descriptor to lock on.
+        preset_type : str
+            The preset type whose file should be locked.
+
+        timeout : float, optional
+            How long to wait for the lock.
 
         Raises
         ------
@@ -935,134 +2089,252 @@ class Presets:
             If we cannot acquire the file lock.
         """
 
-        if self._fd is None:
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            raise BlockingIOError(f'{self.name} is in use by another thread')
+        try:
+            if self._fd is not None:
+                logger.debug('using already open file descriptor')
+                yield self._fd
+                return
             path = self._path(preset_type)
             with open(path, 'r+') as fd:
-                # Set up file lock timeout with a raising handler
-                # We will need this handler due to PEP 475
-                def interrupt(signum, frame):
-                    raise InterruptedError()
-
-                old_handler = signal.signal(signal.SIGALRM, interrupt)
-                try:
-                    signal.setitimer(signal.ITIMER_REAL, timeout)
-                    fcntl.flock(fd, fcntl.LOCK_EX)
-                except InterruptedError:
-                    # Ignore interrupted and proceed to cleanup
-                    pass
-                finally:
-                    # Clean up file lock timeout
-                    signal.setitimer(signal.ITIMER_REAL, 0)
-                    signal.signal(signal.SIGALRM, old_handler)
-                # Error now if we still can't get the lock.
-                # Getting lock twice is safe.
-                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                flock_with_timeout(fd, deadline - time.monotonic())
                 logger.debug('acquired lock for %s', path)
                 self._fd = fd
-                yield fd
-                fcntl.flock(fd, fcntl.LOCK_UN)
-                logger.debug('released lock for %s', path)
-            self._fd = None
-        else:
-            logger.debug('using already open file descriptor')
-            yield self._fd
+                try:
+                    yield fd
+                finally:
+                    self._fd = None
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    logger.debug('released lock for %s', path)
+        finally:
+            self._thread_lock.release()
 
     def _update(self, preset_type, name, value=None, comment=None,
-                active=True):
+                active=True, wait=True):
         """
         Utility function to update a preset position.
 
         Reads the existing preset's datum, updates the value the comment, and
         the active state, and then writes the datum back to the file, updating
         the history accordingly.
+
+        If ``wait`` is `False`, the change is made to the in-memory presets
+        immediately and the file is written later by `preset_writer`.
         """
 
         logger.debug(('call %s presets._update(%s, %s, value=%s, comment=%s, '
-                      'active=%s)'), self._device.name, preset_type, name,
-                     value, comment, active)
+                      'active=%s, wait=%s)'), self._device.name, preset_type,
+                     name, value, comment, active, wait)
         if not isinstance(name, str):
             raise TypeError(('name must be of type <str>, not type'
                              '{}'.format(type(name))))
         if value is not None and not isinstance(value, numbers.Real):
             raise TypeError(('value must be a real numeric type, not type'
                              '{}'.format(type(value))))
+        update = dict(name=name, value=value, comment=comment, active=active)
+        if wait:
+            # Don't let older queued writes land on top of this one
+            if not preset_writer.flush(timeout=self.flush_timeout):
+                logger.warning('Timed out waiting for queued %s preset '
+                               'updates to be saved', self.name)
+            self._save(preset_type, [update])
+        else:
+            with self._thread_lock:
+                self._apply_pending(preset_type, update)
+                self._update_methods()
+            preset_writer.submit(self, preset_type, update)
+
+    def _save(self, preset_type, updates):
+        """
+        Utility function to write several updates to one preset file.
+
+        The file is read and written only once for all of the updates.
+        Each update is a dict of keyword arguments for :meth:`._update`.
+        """
+
+        logger.debug('save %d %s preset updates for %s', len(updates),
+                     preset_type, self._device.name)
+        store = self._store(preset_type)
+        if store is not None:
+            try:
+                for update in updates:
+                    store.update(self._device.name, **update)
+            except sqlite3.OperationalError:
+                self._log_flock_error()
+            return
         try:
             path = self._path(preset_type)
             if not path.exists():
                 path.touch()
                 path.chmod(0o666)
+                preset_index.discard(path)
             with self._file_open_rlock(preset_type):
                 data = self._read(preset_type)
-                if value is None and comment is not None:
-                    value = data[name]['value']
-                if value is not None:
-                    if name not in data:
-                        data[name] = {}
-                    ts = time.strftime('%d %b %Y %H:%M:%S')
-                    data[name]['value'] = value
-                    history = data[name].get('history', {})
-                    if comment:
-                        comment = ' ' + comment
-                    else:
-                        comment = ''
-                    history[ts] = '{:10.4f}{}'.format(value, comment)
-                    data[name]['history'] = history
-                if active:
-                    data[name]['active'] = True
-                else:
-                    data[name]['active'] = False
+                for update in updates:
+                    self._apply_update(data, **update)
                 self._write(preset_type, data)
         except BlockingIOError:
             self._log_flock_error()
 
+    @staticmethod
+    def _apply_update(data, name, value=None, comment=None, active=True):
+        """Utility function to apply one update to a preset file's data."""
+        if value is None and comment is not None:
+            value = data[name]['value']
+        if value is not None:
+            if name not in data:
+                data[name] = {}
+            ts = time.strftime('%d %b %Y %H:%M:%S')
+            data[name]['value'] = value
+            history = data[name].get('history', {})
+            if comment:
+                comment = ' ' + comment
+            else:
+                comment = ''
+            history[ts] = '{:10.4f}{}'.format(value, comment)
+            data[name]['history'] = history
+        if active:
+            data[name]['active'] = True
+        else:
+            data[name]['active'] = False
+
+    def _apply_pending(self, preset_type, update):
+        """
+        Utility function to show an unsaved update in the cache.
+
+        The cached data may be shared with `preset_index`, so this copies
+        before modifying.
+        """
+        data = dict(self._cache.get(preset_type, {}))
+        name = update['name']
+        info = dict(data[name]) if name in data else {}
+        if update['value'] is not None:
+            info['value'] = update['value']
+        elif 'value' not in info:
+            raise KeyError(name)
+        info['active'] = bool(update['active'])
+        data[name] = info
+        self._cache[preset_type] = data
+
     def sync(self):
         """Synchronize the presets with the database."""
         logger.debug('call %s presets.sync()', self._device.name)
-        self._remove_methods()
-        self._cache = {}
+        cache = {}
         logger.debug('filling %s cache', self.name)
         for preset_type in self._paths.keys():
             path = self._path(preset_type)
-            if path.exists():
+            store = self._store(preset_type)
+            if store is not None:
                 try:
-                    self._cache[preset_type] = self._read(preset_type)
+                    cache[preset_type] = store.load(self._device.name)
+                except sqlite3.OperationalError:
+                    self._log_flock_error()
+                    self._keep_cached(cache, preset_type)
+            elif preset_index.exists(path):
+                try:
+                    cache[preset_type] = self._load(preset_type)
                 except BlockingIOError:
                     self._log_flock_error()
+                    self._keep_cached(cache, preset_type)
+                except FileNotFoundError:
+                    logger.debug('%s preset file for %s was removed',
+                                 preset_type, self._device.name)
             else:
                 logger.debug('No %s preset file for %s',
                              preset_type, self._device.name)
-        self._create_methods()
+        # The writer, watcher and user threads can all sync at once
+        with self._thread_lock:
+            self._cache = cache
+            for preset_type, update in preset_writer.pending_updates(self):
+                if preset_type in self._paths:
+                    try:
+                        self._apply_pending(preset_type, update)
+                    except KeyError:
+                        pass
+            self._update_methods()
+
+    def _history(self, preset_type, name):
+        """Utility function to get the history of one preset."""
+        store = self._store(preset_type)
+        if store is not None:
+            return store.history(self._device.name, name)
+        return self._cache[preset_type][name]['history']
+
+    def _keep_cached(self, cache, preset_type):
+        """Keep the last presets of a type that we could not read."""
+        try:
+            cache[preset_type] = self._cache[preset_type]
+        except KeyError:
+            pass
 
     def _log_flock_error(self):
         logger.error(('Unable to acquire file lock for %s. '
                       'File may be being edited by another user.'), self.name)
         logger.debug('', exc_info=True)
 
-    def _create_methods(self):
+    def _update_methods(self):
         """
-        Create the dynamic methods based on the configured paths.
+        Update the dynamic methods based on the configured paths and cache.
 
         Add methods to this object for adding presets of each type, add
         methods to the associated device to move and check each preset, and
         add :class:`PresetPosition` instances to :attr:`.positions` for
         each preset name.
+
+        Only the methods for preset types and names that were added or
+        removed since the last call are changed. The methods look up preset
+        values in the cache when called, so changed values need no updates.
         """
 
-        logger.debug('call %s presets._create_methods()', self._device.name)
-        for preset_type in self._paths.keys():
-            add, add_here = self._make_add(preset_type)
-            self._register_method(self, 'add_' + preset_type, add)
-            self._register_method(self, 'add_here_' + preset_type, add_here)
+        logger.debug('call %s presets._update_methods()', self._device.name)
+        method_types = list(self._paths.keys())
+        active = {}
         for preset_type, data in self._cache.items():
             for name, info in data.items():
                 if info['active']:
-                    mv, umv = self._make_mv_pre(preset_type, name)
-                    wm = self._make_wm_pre(preset_type, name)
-                    self._register_method(self._device, 'mv_' + name, mv)
-                    self._register_method(self._device, 'umv_' + name, umv)
-                    self._register_method(self._device, 'wm_' + name, wm)
-                    setattr(self.positions, name,
-                            PresetPosition(self, preset_type, name))
+                    # Later preset types take priority for duplicate names
+                    active[name] = preset_type
+
+        for preset_type in self._method_types:
+            if preset_type not in method_types:
+                self._unregister_methods(
+                    self, ('add_' + preset_type, 'add_here_' + preset_type))
+        for name, preset_type in self._active.items():
+            if active.get(name) != preset_type:
+                self._unregister_methods(
+                    self._device, ('mv_' + name, 'umv_' + name, 'wm_' + name))
+                delattr(self.positions, name)
+
+        for preset_type in method_types:
+            if preset_type not in self._method_types:
+                add, add_here = self._make_add(preset_type)
+                self._register_method(self, 'add_' + preset_type, add)
+                self._register_method(self, 'add_here_' + preset_type,
+                                      add_here)
+        for name, preset_type in active.items():
+            if self._active.get(name) != preset_type:
+                mv, umv = self._make_mv_pre(preset_type, name)
+                wm = self._make_wm_pre(preset_type, name)
+                self._register_method(self._device, 'mv_' + name, mv)
+                self._register_method(self._device, 'umv_' + name, umv)
+                self._register_method(self._device, 'wm_' + name, wm)
+                setattr(self.positions, name,
+                        PresetPosition(self, preset_type, name))
+
+        self._method_types = method_types
+        self._active = active
+        self._update_state_table()
+
+    def _update_state_table(self):
+        """Sort the active preset values for fast :meth:`.state` lookups."""
+        table = sorted(
+            (self._cache[preset_type][name]['value'], name)
+            for name, preset_type in self._active.items()
+        )
+        self._state_values = [value for value, _ in table]
+        self._state_names = [name for _, name in table]
 
     def _register_method(self, obj, method_name, method):
         """
@@ -1087,7 +2359,7 @@ class Presets:
         ``add_here_preset_type``.
         """
 
-        def add(self, name, value=None, comment=None):
+        def add(self, name, value=None, comment=None, wait=True):
             """
             Add a preset position of type "{}".
 
@@ -1102,14 +2374,19 @@ class Presets:
 
             comment : str, optional
                 A comment to associate with the preset position.
+
+            wait : bool, optional
+                If `False`, return right away and save the preset in the
+                background. Defaults to `True`.
             """
             if value is None:
                 value = self._device.wm()
             self._update(preset_type, name, value=value,
-                         comment=comment)
-            self.sync()
+                         comment=comment, wait=wait)
+            if wait:
+                self.sync()
 
-        def add_here(self, name, comment=None):
+        def add_here(self, name, comment=None, wait=True):
             """
             Add a preset of the current position of type "{}".
 
@@ -1120,9 +2397,13 @@ class Presets:
 
             comment : str, optional
                 A comment to associate with the preset position.
+
+            wait : bool, optional
+                If `False`, return right away and save the preset in the
+                background. Defaults to `True`.
             """
 
-            add(self, name, self._device.wm(), comment=comment)
+            add(self, name, self._device.wm(), comment=comment, wait=wait)
 
         add.__doc__ = add.__doc__.format(preset_type)
         add_here.__doc__ = add_here.__doc__.format(preset_type)
@@ -1201,18 +2482,44 @@ class Presets:
         wm_pre.__doc__ = wm_pre.__doc__.format(name)
         return wm_pre
 
-    def _remove_methods(self):
-        """Remove all methods created in the last call to _create_methods."""
-        logger.debug('call %s presets._remove_methods()', self._device.name)
-        for obj, method_name in self._methods:
+    def _unregister_methods(self, obj, method_names):
+        """
+        Utility function for removing some of the dynamic methods.
+
+        Removes the methods from the object and from the :attr:`._methods`
+        list.
+        """
+
+        logger.debug('unregister methods %s from %s', method_names, obj.name)
+        for method_name in method_names:
+            try:
+                self._methods.remove((obj, method_name))
+            except ValueError:
+                continue
             try:
                 delattr(obj, method_name)
             except AttributeError:
                 pass
             if hasattr(obj, '_tab'):
                 obj._tab.remove(method_name)
-        self._methods = []
-        self.positions = SimpleNamespace()
+
+    def _remove_methods(self):
+        """Remove all methods created by _update_methods."""
+        logger.debug('call %s presets._remove_methods()', self._device.name)
+        with self._thread_lock:
+            for obj, method_name in self._methods:
+                try:
+                    delattr(obj, method_name)
+                except AttributeError:
+                    pass
+                if hasattr(obj, '_tab'):
+                    obj._tab.remove(method_name)
+            self._methods = []
+            self._method_types = []
+            self._active = {}
+            self._state_values = []
+            self._state_names = []
+            self.positions = SimpleNamespace()
 
     @property
     def has_presets(self):
@@ -1221,26 +2528,109 @@ class Presets:
         """
         return bool(self.positions.__dict__)
 
-    def state(self):
+    def state(self, position=None):
         """
         Return the current active preset state name.
 
-        This will be the state string name, or Unknown if we're not at any
-        state.
+        This will be the state string name of the closest preset within 0.5
+        of the current position, or Unknown if we're not at any state.
+
+        Parameters
+        ----------
+        position : float, optional
+            The current position, if it was already read. Otherwise, the
+            position will be read once from the device.
         """
+        values = self._state_values
+        if not values:
+            return 'Unknown'
+        if position is None:
+            position = self._device.wm()
+        index = bisect.bisect_left(values, position)
         state = 'Unknown'
         closest = 0.5
-        for device, method_name in self._methods:
-            if method_name.startswith('wm_'):
-                state_name = method_name.replace('wm_', '', 1)
-                wm_state = getattr(device, method_name)
-                diff = wm_state()
+        # Only the neighbors on either side of the position can be closest
+        for near in (index - 1, index):
+            if 0 <= near < len(values):
+                diff = abs(values[near] - position)
                 if diff < closest:
-                    state = state_name
+                    state = self._state_names[near]
                     closest = diff
         return state
 
 
+def preset_states(devices, timeout=None):
+    """
+    Get the current preset state names for many devices at once.
+
+    The positions of the devices are read concurrently, then each is looked
+    up in its sorted preset values.
+
+    Parameters
+    ----------
+    devices : iterable of FltMvInterface
+        The devices to check.
+
+    timeout : float, optional
+        The total time in seconds to wait for all of the positions.
+
+    Returns
+    -------
+    states : dict
+        Mapping of device name to preset state name. Devices without presets
+        are Unknown, and devices that could not be checked are ERROR.
+    """
+    states = {}
+    pending = {}
+    for device in devices:
+        try:
+            if device.presets._state_values:
+                pending[device] = None
+            else:
+                states[device.name] = 'Unknown'
+        except Exception:
+            logger.debug('Error checking presets of %s', device.name,
+                         exc_info=True)
+            states[device.name] = 'ERROR'
+
+    if utils.in_read_executor():
+        # Don't wait on the pool from inside of it
+        positions = {}
+        for device in pending:
+            try:
+                positions[device] = device.wm()
+            except Exception:
+                logger.debug('Error reading position of %s', device.name,
+                             exc_info=True)
+    else:
+        executor = utils.get_read_executor()
+        for device in pending:
+            pending[device] = executor.submit(device.wm)
+        done, _ = wait_futures(pending.values(), timeout=timeout)
+        positions = {}
+        for device, future in pending.items():
+            if future not in done:
+                future.cancel()
+                logger.debug('Timed out reading position of %s',
+                             device.name)
+                continue
+            try:
+                positions[device] = future.result()
+            except Exception:
+                logger.debug('Error reading position of %s', device.name,
+                             exc_info=True)
+
+    for device in pending:
+        try:
+            states[device.name] = device.presets.state(
+                position=positions[device])
+        except Exception:
+            logger.debug('Error checking preset state of %s', device.name,
+                         exc_info=True)
+            states[device.name] = 'ERROR'
+    return states
+
+
 class PresetPosition:
     """
     Manager for a single preset position.
@@ -1259,7 +2649,7 @@ class PresetPosition:
         self._preset_type = preset_type
         self._name = name
 
-    def update_pos(self, pos=None, comment=None):
+    def update_pos(self, pos=None, comment=None, wait=True):
         """
         Change this preset position and save it.
 
@@ -1271,15 +2661,20 @@ class PresetPosition:
 
         comment : str, optional
             A comment to associate with the preset position.
+
+        wait : bool, optional
+            If `False`, return right away and save the preset in the
+            background. Defaults to `True`.
         """
 
         if pos is None:
             pos = self._presets._device.wm()
         self._presets._update(self._preset_type, self._name, value=pos,
-                              comment=comment)
-        self._presets.sync()
+                              comment=comment, wait=wait)
+        if wait:
+            self._presets.sync()
 
-    def update_comment(self, comment):
+    def update_comment(self, comment, wait=True):
         """
         Revise the most recent comment in the preset history.
 
@@ -1287,18 +2682,32 @@ class PresetPosition:
         ----------
         comment : str
             A comment to associate with the preset position.
+
+        wait : bool, optional
+            If `False`, return right away and save the comment in the
+            background. Defaults to `True`.
         """
 
-        self._presets._update(self._preset_type, self._name, comment=comment)
-        self._presets.sync()
+        self._presets._update(self._preset_type, self._name, comment=comment,
+                              wait=wait)
+        if wait:
+            self._presets.sync()
 
-    def deactivate(self):
+    def deactivate(self, wait=True):
         """
         Deactivate a preset from a device.
         This can always be undone unless you edit the underlying file.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            If `False`, return right away and save the change in the
+            background. Defaults to `True`.
         """
-        self._presets._update(self._preset_type, self._name, active=False)
-        self._presets.sync()
+        self._presets._update(self._preset_type, self._name, active=False,
+                              wait=wait)
+        if wait:
+            self._presets.sync()
 
     @property
     def info(self):
@@ -1315,7 +2724,7 @@ class PresetPosition:
         """
         This position history associated with this preset, returned as a dict.
         """
-        return self.info['history']
+        return self._presets._history(self._preset_type, self._name)
 
     @property
     def path(self):
@@ -1566,7 +2975,8 @@ class LightpathMixin(OphydObject):
                     kw = dict(obj=obj)
                     kw.update(kwargs)
                     utils.schedule_task(self._update_lightpath,
-                                        args=args, kwargs=kw, delay=1.0)
+                                        args=args, kwargs=kw, delay=1.0,
+                                        coalesce=True)
         except Exception:
             # Without this, callbacks fail silently
             logger.exception('Error in lightpath update callback for %s.',
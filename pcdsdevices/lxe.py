@@ -236,14 +236,14 @@ class _ScaledUnitConversionDerivedSignal(UnitConversionDerivedSignal):
         '''Compute derived signal value -> original signal value'''
         if self.user_offset is not None:
             value = value - self.user_offset
-        value /= self.scale
+        value = value / self.scale
         return convert_unit(value, self.derived_units, self.original_units)
 
     def inverse(self, value):
         '''Compute original signal value -> derived signal value'''
         derived_value = convert_unit(value, self.original_units,
                                      self.derived_units)
-        derived_value *= self.scale
+        derived_value = derived_value * self.scale
         if self.user_offset is not None:
             derived_value += self.user_offset
         return derived_value
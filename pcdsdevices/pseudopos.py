@@ -18,7 +18,7 @@ from scipy.constants import speed_of_light
 from .device import InterfaceComponent as ICpt
 from .device import InterfaceDevice
 from .interface import FltMvInterface
-from .signal import NotepadLinkedSignal
+from .signal import NotepadLinkedSignal, notepad_writer
 from .sim import FastMotor
 from .utils import convert_unit, get_status_float, get_status_value
 
@@ -89,6 +89,8 @@ class PseudoSingleInterface(FltMvInterface, PseudoSingle):
             units = get_status_value(status_info, 'notepad_readback', 'units')
         position = get_status_float(
             status_info, 'position', precision=3, format='e')
+        preset = get_status_value(status_info, 'preset',
+                                  default_value='Unknown')
         # if a dial_pos is not present we can assume that the dial position is
         # the same as the normal position
         dial_pos = self.calculated_dial_pos or position
@@ -102,7 +104,7 @@ class PseudoSingleInterface(FltMvInterface, PseudoSingle):
 Virtual Motor {name}
 Current position (user, dial): {position}, {dial_pos} [{units}]
 User limits (low, high): {low}, {high} [{units}]
-Preset position: {self.presets.state()}
+Preset position: {preset}
 """
 
 
@@ -123,6 +125,9 @@ class PseudoPositioner(ophyd.pseudopos.PseudoPositioner):
 
     """ + ophyd.pseudopos.PseudoPositioner.__doc__
 
+    # Skip notepad updates that change the value by less than this
+    notepad_deadband = 0
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -136,6 +141,9 @@ class PseudoPositioner(ophyd.pseudopos.PseudoPositioner):
         """
         Update the notepad IOC with a fully-specified ``PseudoPos``.
 
+        The values are handed to `notepad_writer`, which writes them from
+        its own thread, so this never waits on the notepad IOC.
+
         Parameters
         ----------
         position : PseudoPos
@@ -145,19 +153,10 @@ class PseudoPositioner(ophyd.pseudopos.PseudoPositioner):
             The signal attribute name, such as ``notepad_setpoint``.
         """
         for positioner, value in zip(self._pseudo, position):
-            try:
-                signal = getattr(positioner, attr, None)
-                if signal is None:
-                    continue
-                if signal.connected and signal.write_access:
-                    if signal.get(use_monitor=True) != value:
-                        if isinstance(signal, ophyd.signal.EpicsSignalBase):
-                            signal.put(value, wait=False)
-                        else:
-                            signal.put(value)
-            except Exception as ex:
-                self.log.debug('Failed to update notepad %s to position %s',
-                               attr, value, exc_info=ex)
+            signal = getattr(positioner, attr, None)
+            if signal is not None:
+                notepad_writer.submit(signal, value,
+                                      deadband=self.notepad_deadband)
 
     @pseudo_position_argument
     def move(self, position, wait=True, timeout=None, moved_cb=None):
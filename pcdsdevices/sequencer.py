@@ -7,6 +7,7 @@ from ophyd.status import DeviceStatus, SubscriptionStatus
 from ophyd.utils.epics_pvs import raise_if_disconnected
 
 from .interface import BaseInterface
+from .signal import put_batch
 
 logger = logging.getLogger(__name__)
 
@@ -104,18 +105,22 @@ class EventSequence(BaseInterface, Device):
         for i in range(len(sequence)):
             new_seq[i] = sequence[i]
 
-        # Update the length of the sequence if update_length == True and
-        # the event sequence is a child of the EventSequencer
-        if self.parent and update_length is True:
-            new_len = len(sequence)
-            self.parent.sequence_length.put(new_len)
-
         seq = [arr for arr in zip(*new_seq)]
-        self.ec_array.put(seq[0])
-        self.bd_array.put(seq[1])
-        self.fd_array.put(seq[2])
-        self.bc_array.put(seq[3])
-        self.seq_proc.put(1)  # Force the sequencer to update sequence
+        # Wait for seq_proc so that the sequence is loaded before a start()
+        with put_batch() as batch:
+            # Update the length of the sequence if update_length == True and
+            # the event sequence is a child of the EventSequencer
+            if self.parent and update_length is True:
+                new_len = len(sequence)
+                batch.put(self.parent.sequence_length, new_len)
+
+            batch.put(self.ec_array, seq[0])
+            batch.put(self.bd_array, seq[1])
+            batch.put(self.fd_array, seq[2])
+            batch.put(self.bc_array, seq[3])
+            batch.barrier()
+            # Force the sequencer to update sequence
+            batch.put(self.seq_proc, 1)
 
     def show(self, num_lines=None):
         """
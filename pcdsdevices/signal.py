@@ -9,18 +9,25 @@ if __name__ != 'pcdsdevices.signal':
                        'inside the pcdsdevices directory and can cause '
                        'extremely confusing bugs. Please run your script '
                        'elsewhere for better results.')
+import collections
 import logging
+import math
 import numbers
+import time
 import typing
-from threading import RLock
+from concurrent.futures import wait as wait_futures
+from contextlib import contextmanager
+from threading import Condition, RLock, Thread
 
 import numpy as np
 from ophyd.signal import (DerivedSignal, EpicsSignal, EpicsSignalBase,
-                          EpicsSignalRO, Signal, SignalRO)
+                          EpicsSignalRO, ReadTimeoutError, Signal, SignalRO)
 from ophyd.sim import FakeEpicsSignal, FakeEpicsSignalRO, fake_device_cache
+from ophyd.status import Status
 from pytmc.pragmas import normalize_io
 
-from .utils import convert_unit
+from .utils import (get_read_executor, get_unit_converter, in_read_executor,
+                    schedule_task)
 
 logger = logging.getLogger(__name__)
 
@@ -127,16 +134,43 @@ class AggregateSignal(Signal):
 
     _sub_signals : list
         Signals that contribute to this signal.
+
+    late_signals : list
+        Signals that timed out the last time the cache was filled.
+
+    fill_timeout : float
+        The longest time to wait for concurrent sub-signal reads when no
+        timeout is given.
+
+    Parameters
+    ----------
+    coalesce_window : float, optional
+        If provided, wait this many seconds after a sub-signal update for
+        more updates before recalculating, and only send the value that
+        results from the whole burst of updates.
+
+    max_emit_rate : float, optional
+        If provided, send value updates at most this many times per second.
+        Updates in between are combined as with ``coalesce_window``.
     """
 
     _update_only_on_change = True
+    fill_timeout = 10.0
 
-    def __init__(self, *, name, **kwargs):
+    def __init__(self, *, name, coalesce_window=None, max_emit_rate=None,
+                 **kwargs):
         super().__init__(name=name, **kwargs)
         self._cache = {}
+        self.late_signals = []
         self._has_subscribed = False
         self._lock = RLock()
         self._sub_signals = []
+        self.coalesce_window = coalesce_window
+        self.max_emit_rate = max_emit_rate
+        self._flush_pending = False
+        self._flush_old_value = None
+        self._last_emit = None
+        self._counts = dict(updates=0, recomputes=0, emits=0)
 
     def _calc_readback(self):
         """
@@ -159,15 +193,97 @@ class AggregateSignal(Signal):
             return self._readback
 
     def _update_state(self):
-        """Recalculate the state."""
+        """Recalculate the state, if we have a value for every signal."""
         with self._lock:
-            self._readback = self._calc_readback()
+            if all(sig in self._cache for sig in self._sub_signals):
+                self._readback = self._calc_readback()
+
+    def _fill_cache(self, signals, timeout=None, **kwargs):
+        """
+        Read sub-signals into the cache all at once.
+
+        Parameters
+        ----------
+        signals : list of Signal
+            The sub-signals to read.
+
+        timeout : float, optional
+            The total time to wait for all of the reads. This is also passed
+            to each signal's ``get``.
+
+        **kwargs :
+            Passed to each signal's ``get``.
+
+        Returns
+        -------
+        late : list of Signal
+            The signals that timed out. These are also saved as
+            ``late_signals``.
+        """
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        late = []
+        if len(signals) == 1 or in_read_executor():
+            # Waiting on the pool from inside it can use up all of its
+            # threads, so nested aggregates read one at a time
+            for sig in signals:
+                try:
+                    self._cache[sig] = sig.get(**kwargs)
+                except TimeoutError:
+                    late.append(sig)
+        else:
+            if timeout is None:
+                timeout = self.fill_timeout
+            executor = get_read_executor()
+            futures = {sig: executor.submit(sig.get, **kwargs)
+                       for sig in signals}
+            done, _ = wait_futures(futures.values(), timeout=timeout)
+            error = None
+            for sig, future in futures.items():
+                if future not in done:
+                    future.cancel()
+                    late.append(sig)
+                    continue
+                try:
+                    self._cache[sig] = future.result()
+                except TimeoutError:
+                    late.append(sig)
+                except Exception as ex:
+                    error = error or ex
+            if error is not None:
+                raise error
+        self.late_signals = late
+        if late:
+            logger.debug('%s timed out reading %s', self.name,
+                         ', '.join(sig.name for sig in late))
+        return late
 
     def get(self, **kwargs):
-        """Update all values and recalculate."""
+        """
+        Read the sub-signals and recalculate.
+
+        The sub-signals are read concurrently. Once we are subscribed to the
+        sub-signals, their monitors keep the cache current and only the
+        sub-signals that have never reported a value are read.
+
+        Raises
+        ------
+        ReadTimeoutError
+            If any of the sub-signals could not be read in time.
+        """
         with self._lock:
-            for signal in self._sub_signals:
-                self._cache[signal] = signal.get(**kwargs)
+            if self._has_subscribed:
+                signals = [sig for sig in self._sub_signals
+                           if sig not in self._cache]
+            else:
+                signals = list(self._sub_signals)
+            if signals:
+                late = self._fill_cache(signals, **kwargs)
+                if late:
+                    raise ReadTimeoutError(
+                        f'{self.name} timed out reading '
+                        f'{", ".join(sig.name for sig in late)}'
+                    )
             self._update_state()
             return self._readback
 
@@ -181,13 +297,40 @@ class AggregateSignal(Signal):
         See the `ophyd` documentation for details.
         """
 
-        cid = super().subscribe(cb, event_type=event_type, run=run)
         if event_type in (None, self.SUB_VALUE) and not self._has_subscribed:
             # We need to subscribe to ALL relevant signals!
-            for signal in self._sub_signals:
-                signal.subscribe(self._run_sub_value, run=False)
-            self.get()  # Ensure we have a full cache
-        return cid
+            with self._lock:
+                for signal in self._sub_signals:
+                    signal.subscribe(self._run_sub_value, run=False)
+                self._has_subscribed = True
+                # Ensure we have a full cache, monitors fill in the rest
+                try:
+                    self._fill_cache(list(self._sub_signals))
+                except Exception:
+                    logger.debug('%s could not fill its cache', self.name,
+                                 exc_info=True)
+                self._update_state()
+        return super().subscribe(cb, event_type=event_type, run=run)
+
+    @property
+    def coalesce_stats(self):
+        """
+        Counts of sub-signal ``updates``, ``recomputes`` and ``emits``.
+
+        ``saved`` is the number of recomputes skipped by combining updates.
+        """
+        with self._lock:
+            stats = dict(self._counts)
+        stats['saved'] = stats['updates'] - stats['recomputes']
+        return stats
+
+    def _emit(self, value, old_value):
+        """Send a value update to our subscribers, if needed."""
+        if value != old_value or not self._update_only_on_change:
+            self._counts['emits'] += 1
+            self._last_emit = time.monotonic()
+            self._run_subs(sub_type=self.SUB_VALUE, obj=self, value=value,
+                           old_value=old_value)
 
     def _run_sub_value(self, *args, **kwargs):
         kwargs.pop('sub_type')
@@ -195,47 +338,233 @@ class AggregateSignal(Signal):
         kwargs.pop('old_value')
         value = kwargs['value']
         with self._lock:
-            old_value = self._readback
-            # Update just one value and assume the rest are cached
-            # This allows us to run subs without EPICS gets
-            value = self._insert_value(sig, value)
-            if value != old_value or not self._update_only_on_change:
-                self._run_subs(sub_type=self.SUB_VALUE, obj=self, value=value,
-                               old_value=old_value)
+            self._counts['updates'] += 1
+            if self.coalesce_window is None and self.max_emit_rate is None:
+                old_value = self._readback
+                # Update just one value and assume the rest are cached
+                # This allows us to run subs without EPICS gets
+                self._counts['recomputes'] += 1
+                value = self._insert_value(sig, value)
+                self._emit(value, old_value)
+                return
+            # Hold on to the value and recalculate once the burst is over
+            self._cache[sig] = value
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+            self._flush_old_value = self._readback
+            delay = self.coalesce_window or 0
+            if self.max_emit_rate and self._last_emit is not None:
+                next_emit = self._last_emit + 1 / self.max_emit_rate
+                delay = max(delay, next_emit - time.monotonic())
+        schedule_task(self._flush, delay=delay)
+
+    def _flush(self):
+        """Recalculate and send the settled value after a burst of updates."""
+        with self._lock:
+            self._flush_pending = False
+            self._counts['recomputes'] += 1
+            self._update_state()
+            self._emit(self._readback, self._flush_old_value)
 
 
-class AvgSignal(Signal):
+class RollingStats:
     """
-    Signal that acts as a rolling average of another signal.
+    Statistics over a rolling window of values, updated in O(1).
 
-    This will subscribe to a signal, and fill an internal buffer with values
-    from `SUB_VALUE`. It will update its own value to be the mean of the last n
-    accumulated values, up to the buffer size. If we haven't filled this
-    buffer, this will still report a mean value composed of all the values
-    we've receieved so far.
+    Running sums are kept for the mean and standard deviation and monotonic
+    queues for the minimum and maximum, so adding a value does not revisit
+    the rest of the window. NaN values take up a place in the window but are
+    left out of the statistics.
 
-    Warning: this means that if we only have recieved ONE value, the mean will
-    just be the mean of a single value!
+    Parameters
+    ----------
+    size : int, optional
+        The maximum number of values in the window.
+
+    window : float, optional
+        The maximum age of values in the window in seconds, compared to the
+        newest timestamp. Values only expire when new values are added.
+    """
+
+    stat_names = ('mean', 'std', 'min', 'max', 'count')
+
+    def __init__(self, size=None, window=None):
+        if size is None and window is None:
+            raise ValueError('Must provide a window size, duration, or both')
+        if size is not None and size < 1:
+            raise ValueError(f'Window size must be at least 1, not {size}')
+        self.size = size
+        self.window = window
+        self.clear()
+
+    def clear(self):
+        """Remove all values from the window."""
+        # Entries are (sequence number, timestamp, value)
+        self._entries = collections.deque()
+        self._min = collections.deque()
+        self._max = collections.deque()
+        self._seq = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._shift = None
+        self._adds = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def values(self):
+        """The values in the window, oldest first."""
+        return np.array([value for _, _, value in self._entries], dtype=float)
+
+    def add(self, value, timestamp=None):
+        """
+        Add a value to the window, removing old values as needed.
+
+        Parameters
+        ----------
+        value : float
+            The new value.
+
+        timestamp : float, optional
+            The time of the new value. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        value = float(value)
+        seq = self._seq
+        self._seq += 1
+        self._entries.append((seq, timestamp, value))
+        if not math.isnan(value):
+            if self._shift is None:
+                # Sums are taken relative to this to limit rounding errors
+                self._shift = value
+            delta = value - self._shift
+            self._count += 1
+            self._sum += delta
+            self._sumsq += delta * delta
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((seq, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((seq, value))
+        self._expire(timestamp)
+        # Recalculate the sums once per window to keep errors from building
+        self._adds += 1
+        if self._adds >= len(self._entries):
+            self._recalculate()
+
+    def _expire(self, timestamp):
+        entries = self._entries
+        while entries and (
+            (self.size is not None and len(entries) > self.size)
+            or (self.window is not None
+                and entries[0][1] < timestamp - self.window)
+        ):
+            seq, _, value = entries.popleft()
+            if math.isnan(value):
+                continue
+            delta = value - self._shift
+            self._count -= 1
+            self._sum -= delta
+            self._sumsq -= delta * delta
+            if self._min[0][0] == seq:
+                self._min.popleft()
+            if self._max[0][0] == seq:
+                self._max.popleft()
+
+    def _recalculate(self):
+        values = self.values
+        values = values[~np.isnan(values)]
+        self._adds = 0
+        self._count = len(values)
+        if self._count:
+            self._shift = float(values[-1])
+            deltas = values - self._shift
+            self._sum = float(np.sum(deltas))
+            self._sumsq = float(np.sum(deltas * deltas))
+        else:
+            self._shift = None
+            self._sum = 0.0
+            self._sumsq = 0.0
+
+    @property
+    def count(self):
+        """The number of non-NaN values in the window."""
+        return self._count
+
+    @property
+    def mean(self):
+        """The mean of the window, or NaN if it is empty."""
+        if not self._count:
+            return np.nan
+        return self._shift + self._sum / self._count
+
+    @property
+    def std(self):
+        """The standard deviation of the window, or NaN if it is empty."""
+        if not self._count:
+            return np.nan
+        mean = self._sum / self._count
+        return math.sqrt(max(self._sumsq / self._count - mean * mean, 0.0))
+
+    @property
+    def min(self):
+        """The smallest value in the window, or NaN if it is empty."""
+        return self._min[0][1] if self._min else np.nan
+
+    @property
+    def max(self):
+        """The largest value in the window, or NaN if it is empty."""
+        return self._max[0][1] if self._max else np.nan
+
+    def get_stats(self):
+        """Get a dictionary of all of the statistics."""
+        return {stat: getattr(self, stat) for stat in self.stat_names}
+
+
+class RollingStatsSignal(Signal):
+    """
+    Signal that reports a rolling statistic of another signal.
+
+    This will subscribe to a signal and keep a window of the values from
+    `SUB_VALUE`. Its own value is one statistic of that window, chosen by
+    ``stat``, and all of the statistics are available from `stats`.
+    Each update takes the same time regardless of the window size.
 
     Parameters
     ----------
     signal : Signal
         Any subclass of `ophyd.signal.Signal` that returns a numeric value.
-        This signal will be subscribed to be `AvgSignal` to calculate the mean.
+        This signal will be subscribed to calculate the statistics.
 
-    averages : int
-        The number of `SUB_VALUE` updates to include in the average. New values
-        after this number is reached will begin overriding old values.
+    averages : int, optional
+        The number of `SUB_VALUE` updates to include in the window.
+
+    window : float, optional
+        The number of seconds of updates to include in the window, based on
+        the update timestamps. May be combined with ``averages``.
+
+    stat : {'mean', 'std', 'min', 'max', 'count'}, optional
+        The statistic to use as this signal's value. Defaults to 'mean'.
     """
 
-    def __init__(self, signal, averages, *, name, parent=None, **kwargs):
+    def __init__(self, signal, averages=None, *, window=None, stat='mean',
+                 name, parent=None, **kwargs):
+        if stat not in RollingStats.stat_names:
+            raise ValueError(f'Unknown stat {stat}, must be one of '
+                             f'{RollingStats.stat_names}')
         super().__init__(name=name, parent=parent, **kwargs)
         if isinstance(signal, str):
             signal = getattr(parent, signal)
         self.raw_sig = signal
+        self.stat = stat
         self._lock = RLock()
-        self.averages = averages
-        self.raw_sig.subscribe(self._update_avg)
+        self._rolling = RollingStats(size=averages, window=window)
+        self.raw_sig.subscribe(self._update_stats)
 
     @property
     def connected(self):
@@ -243,27 +572,78 @@ class AvgSignal(Signal):
 
     @property
     def averages(self):
-        """The size of the internal buffer of values to average over."""
-        return self._avg
+        """The maximum number of values to include."""
+        return self._rolling.size
 
     @averages.setter
     def averages(self, avg):
-        """Reinitialize an empty internal buffer of size `avg`."""
+        """Start over with a window of `avg` values."""
+        with self._lock:
+            self._rolling = RollingStats(size=avg, window=self.window)
+
+    @property
+    def window(self):
+        """The maximum age of values to include, in seconds."""
+        return self._rolling.window
+
+    @window.setter
+    def window(self, window):
+        """Start over with a window of `window` seconds."""
         with self._lock:
-            self._avg = avg
-            self.index = 0
-            # Allocate uninitalized array
-            self.values = np.empty(avg)
-            # Fill with nan
-            self.values.fill(np.nan)
-
-    def _update_avg(self, *args, value, **kwargs):
-        """Add new value to the buffer, overriding old values if needed."""
+            self._rolling = RollingStats(size=self.averages, window=window)
+
+    @property
+    def values(self):
+        """The values in the window, oldest first."""
+        with self._lock:
+            return self._rolling.values
+
+    @property
+    def stats(self):
+        """Dictionary of the mean, std, min, max and count of the window."""
         with self._lock:
-            self.values[self.index] = value
-            self.index = (self.index + 1) % len(self.values)
-            # This takes a mean, skipping nan values.
-            self.put(np.nanmean(self.values))
+            return self._rolling.get_stats()
+
+    def _update_stats(self, *args, value, timestamp=None, **kwargs):
+        """Add a new value to the window and report the new statistic."""
+        with self._lock:
+            self._rolling.add(value, timestamp)
+            self.put(getattr(self._rolling, self.stat))
+
+
+class AvgSignal(RollingStatsSignal):
+    """
+    Signal that acts as a rolling average of another signal.
+
+    This will subscribe to a signal, and fill an internal buffer with values
+    from `SUB_VALUE`. It will update its own value to be the mean of the last n
+    accumulated values, up to the buffer size. If we haven't filled this
+    buffer, this will still report a mean value composed of all the values
+    we've receieved so far.
+
+    Warning: this means that if we only have recieved ONE value, the mean will
+    just be the mean of a single value!
+
+    The standard deviation, minimum, maximum and count are also available
+    from `stats`; see `RollingStatsSignal`.
+
+    Parameters
+    ----------
+    signal : Signal
+        Any subclass of `ophyd.signal.Signal` that returns a numeric value.
+        This signal will be subscribed to be `AvgSignal` to calculate the mean.
+
+    averages : int
+        The number of `SUB_VALUE` updates to include in the average. New values
+        after this number is reached will begin overriding old values.
+
+    window : float, optional
+        If provided, also leave out values older than this many seconds.
+    """
+
+    def __init__(self, signal, averages, *, name, parent=None, **kwargs):
+        super().__init__(signal, averages, name=name, parent=parent,
+                         stat='mean', **kwargs)
 
 
 class NotImplementedSignal(SignalRO):
@@ -308,11 +688,13 @@ class _OptionalEpicsSignal(Signal):
     def __init__(self, read_pv, write_pv=None, *, name, parent=None, kind=None,
                  **kwargs):
         self._saw_connection = False
+        self._use_epics_signal = False
         self._epics_signal = EpicsSignal(
             read_pv=read_pv, write_pv=write_pv, parent=self, name=name,
             kind=kind, **kwargs
         )
         super().__init__(name=name, parent=parent, kind=kind)
+        self._update_proxy()
         self._epics_signal.subscribe(
             self._epics_meta_update,
             event_type=self._epics_signal.SUB_META,
@@ -333,11 +715,31 @@ class _OptionalEpicsSignal(Signal):
         if not self._saw_connection and kwargs.get('connected', False):
             self._epics_signal.subscribe(self._epics_value_update)
             self._saw_connection = True
+        if 'connected' in kwargs:
+            self._update_proxy()
 
     def destroy(self):
         super().destroy()
         self._epics_signal.destroy()
         self._epics_signal = None
+        # Go back to the class-level proxies
+        for method_name in self._proxy_methods:
+            self.__dict__.pop(method_name, None)
+
+    def _update_proxy(self):
+        """
+        Point the proxied methods and properties at the right signal.
+
+        This binds the methods directly on the instance so that each call
+        skips :meth:`should_use_epics_signal`. It runs on every connection
+        change, and subclasses should call it if their choice changes for
+        any other reason.
+        """
+        self._use_epics_signal = self.should_use_epics_signal()
+        owner = (self._epics_signal if self._use_epics_signal
+                 else super(_OptionalEpicsSignal, self))
+        for method_name in self._proxy_methods:
+            setattr(self, method_name, getattr(owner, method_name))
 
     def should_use_epics_signal(self) -> bool:
         """
@@ -353,10 +755,16 @@ class _OptionalEpicsSignal(Signal):
         """
         return self._saw_connection
 
-    def _proxy_method(method_name):  # noqa
+    _proxy_methods = []
+
+    def _proxy_method(method_name, proxy_methods=_proxy_methods):  # noqa
         """
         Proxy a method from either the EpicsSignal or the superclass Signal.
+
+        The selector is only used until :meth:`_update_proxy` binds the
+        chosen method on the instance.
         """
+        proxy_methods.append(method_name)
 
         def method_selector(self, *args, **kwargs):
             owner = (self._epics_signal if self.should_use_epics_signal()
@@ -377,7 +785,7 @@ class _OptionalEpicsSignal(Signal):
     def _proxy_property(prop_name, value):  # noqa
         """Read-only property proxy for the internal EPICS Signal."""
         def getter(self):
-            if self.should_use_epics_signal():
+            if self._use_epics_signal:
                 return getattr(self._epics_signal, prop_name)
             return value
 
@@ -489,6 +897,137 @@ class FakeNotepadLinkedSignal(FakeEpicsSignal):
                          attr_name=attr_name, name=name, **kwargs)
 
 
+class NotepadWriter:
+    """
+    Background thread that writes values to notepad signals.
+
+    Only the latest value submitted for each signal is kept, and each
+    signal is written at most ``max_rate`` times per second, so callbacks
+    can submit values as often as they like without waiting on the notepad
+    IOC. One instance, ``notepad_writer``, is shared by all devices.
+
+    Parameters
+    ----------
+    max_rate : float, optional
+        The most writes per second to each signal.
+    """
+
+    def __init__(self, max_rate=10.0):
+        self.max_rate = max_rate
+        self._cond = Condition()
+        self._pending = {}
+        self._last_write = {}
+        self._busy = False
+        self._flushing = 0
+        self._thread = None
+        self.counts = dict(submitted=0, written=0, skipped=0)
+
+    def submit(self, signal, value, deadband=0):
+        """
+        Queue a value to be written to a signal.
+
+        Parameters
+        ----------
+        signal : Signal
+            The notepad signal.
+
+        value : any
+            The new value. This replaces any value for the same signal that
+            has not been written yet.
+
+        deadband : float, optional
+            Skip the write if the signal's value is already within this
+            amount of the new value.
+        """
+        with self._cond:
+            self.counts['submitted'] += 1
+            self._pending.pop(signal, None)
+            self._pending[signal] = (value, deadband)
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, daemon=True,
+                    name='pcdsdevices_notepad_writer',
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Write all of the queued values now, ignoring ``max_rate``.
+
+        Returns
+        -------
+        done : bool
+            `False` if the timeout expired first.
+        """
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(
+                    lambda: not self._pending and not self._busy,
+                    timeout=timeout,
+                )
+            finally:
+                self._flushing -= 1
+
+    def _next_write(self):
+        """Pick the next signal that may be written, or how long to wait."""
+        now = time.monotonic()
+        wait = None
+        for signal in self._pending:
+            if self._flushing or not self.max_rate:
+                return signal, None
+            ready = self._last_write.get(signal, 0) + 1 / self.max_rate
+            if ready <= now:
+                return signal, None
+            if wait is None or ready - now < wait:
+                wait = ready - now
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                signal, wait = self._next_write()
+                while signal is None:
+                    self._cond.wait(wait)
+                    signal, wait = self._next_write()
+                value, deadband = self._pending.pop(signal)
+                self._last_write[signal] = time.monotonic()
+                self._busy = True
+            written = self._write(signal, value, deadband)
+            with self._cond:
+                self.counts['written' if written else 'skipped'] += 1
+
+    @staticmethod
+    def _write(signal, value, deadband):
+        """Write one value if it is outside of the deadband."""
+        try:
+            if not (signal.connected and signal.write_access):
+                return False
+            current = signal.get(use_monitor=True)
+            try:
+                if abs(current - value) <= deadband:
+                    return False
+            except TypeError:
+                if current == value:
+                    return False
+            if isinstance(signal, EpicsSignalBase):
+                signal.put(value, wait=False)
+            else:
+                signal.put(value)
+            return True
+        except Exception as ex:
+            logger.debug('Failed to update notepad %s to %s',
+                         getattr(signal, 'name', signal), value, exc_info=ex)
+            return False
+
+
+notepad_writer = NotepadWriter()
+
+
 # NOTE: This is an *on-import* update of the ophyd "fake" device cache
 fake_device_cache[NotepadLinkedSignal] = FakeNotepadLinkedSignal
 
@@ -560,6 +1099,8 @@ class UnitConversionDerivedSignal(DerivedSignal):
         self.original_units = original_units
         self._user_offset = user_offset
         self._custom_limits = limits
+        self._limits_cache = None
+        self._describe_cache = None
         super().__init__(derived_from, **kwargs)
         self._metadata['units'] = derived_units
 
@@ -572,15 +1113,17 @@ class UnitConversionDerivedSignal(DerivedSignal):
         '''Compute derived signal value -> original signal value'''
         if self.user_offset is None:
             raise ValueError(f'{self.name} must be set to a non-None value.')
-        return convert_unit(value - self.user_offset,
-                            self.derived_units, self.original_units)
+        converter = get_unit_converter(self.derived_units,
+                                       self.original_units)
+        return converter(value - self.user_offset)
 
     def inverse(self, value):
         '''Compute original signal value -> derived signal value'''
         if self.user_offset is None:
             raise ValueError(f'{self.name} must be set to a non-None value.')
-        return convert_unit(value, self.original_units,
-                            self.derived_units) + self.user_offset
+        converter = get_unit_converter(self.original_units,
+                                       self.derived_units)
+        return converter(value) + self.user_offset
 
     @property
     def limits(self):
@@ -597,12 +1140,21 @@ class UnitConversionDerivedSignal(DerivedSignal):
             return self._custom_limits
 
         # Fall back to the superclass derived_from limits:
-        return tuple(
-            sorted(self.inverse(v) for v in self._derived_from.limits)
-        )
+        original_limits = tuple(self._derived_from.limits)
+        key = (original_limits, self.original_units, self.user_offset)
+        if self._limits_cache is None or self._limits_cache[0] != key:
+            limits = tuple(sorted(self.inverse(v) for v in original_limits))
+            self._limits_cache = (key, limits)
+        return self._limits_cache[1]
+
+    def _clear_caches(self):
+        """Forget the converted limits and description."""
+        self._limits_cache = None
+        self._describe_cache = None
 
     @limits.setter
     def limits(self, value):
+        self._clear_caches()
         if value is None:
             self._custom_limits = None
             return
@@ -621,6 +1173,7 @@ class UnitConversionDerivedSignal(DerivedSignal):
     def user_offset(self, offset):
         offset_change = -self._user_offset + offset
         self._user_offset = offset
+        self._clear_caches()
         self._recalculate_position()
         if self._custom_limits is not None:
             self._custom_limits = (
@@ -643,6 +1196,7 @@ class UnitConversionDerivedSignal(DerivedSignal):
             self._derived_value_callback(value)
 
     def _derived_metadata_callback(self, *, connected, **kwargs):
+        self._clear_caches()
         if connected and 'units' in kwargs:
             if self.original_units is None:
                 self.original_units = kwargs['units']
@@ -651,14 +1205,21 @@ class UnitConversionDerivedSignal(DerivedSignal):
         super()._derived_metadata_callback(connected=connected, **kwargs)
 
     def describe(self):
-        full_desc = super().describe()
-        desc = full_desc[self.name]
-        desc['units'] = self.derived_units
-        # Note: this should be handled in ophyd:
-        for key in ('lower_ctrl_limit', 'upper_ctrl_limit'):
-            if key in desc:
-                desc[key] = self.inverse(desc[key])
-        return full_desc
+        """
+        Description based on the original signal description.
+
+        This is kept until the metadata or ``user_offset`` changes.
+        """
+        if self._describe_cache is None:
+            full_desc = super().describe()
+            desc = full_desc[self.name]
+            desc['units'] = self.derived_units
+            # Note: this should be handled in ophyd:
+            for key in ('lower_ctrl_limit', 'upper_ctrl_limit'):
+                if key in desc:
+                    desc[key] = self.inverse(desc[key])
+            self._describe_cache = desc
+        return {self.name: dict(self._describe_cache)}
 
 
 class SignalEditMD(Signal):
@@ -702,6 +1263,13 @@ class SignalEditMD(Signal):
             pass
         return md
 
+    def _metadata_item(self, key):
+        """Get one metadata value without building the full dictionary."""
+        override = getattr(self, '_metadata_override', None)
+        if override and key in override:
+            return override[key]
+        return self._metadata[key]
+
     # Switch out _metadata for metadata
     def _run_metadata_callbacks(self):
         self._metadata_thread_ctx.run(self._run_subs, sub_type=self.SUB_META,
@@ -712,16 +1280,16 @@ class EpicsSignalBaseEditMD(EpicsSignalBase, SignalEditMD):
     # Switch out _metadata for metadata where appropriate
     @property
     def precision(self):
-        return self.metadata['precision']
+        return self._metadata_item('precision')
 
     @property
     def limits(self):
-        return (self.metadata['lower_ctrl_limit'],
-                self.metadata['upper_ctrl_limit'])
+        return (self._metadata_item('lower_ctrl_limit'),
+                self._metadata_item('upper_ctrl_limit'))
 
     def describe(self):
         desc = super().describe()
-        desc[self.name]['units'] = self.metadata['units']
+        desc[self.name]['units'] = self._metadata_item('units')
         return desc
 
 
@@ -757,3 +1325,160 @@ class FakeEpicsSignalROEditMD(FakeEpicsSignalRO):
 
 fake_device_cache[EpicsSignalEditMD] = FakeEpicsSignalEditMD
 fake_device_cache[EpicsSignalROEditMD] = FakeEpicsSignalROEditMD
+
+
+class PutBatch:
+    """
+    A group of puts to issue together.
+
+    Puts are collected with :meth:`put` and issued by :meth:`start`. Puts
+    between barriers are all issued at once, and each barrier waits for the
+    puts before it to complete before going on. EPICS puts use put
+    completion callbacks, so no thread waits on any of them. Usually made
+    by :func:`put_batch`.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        The time allowed for all of the puts to complete. Pass `None` to
+        allow them forever.
+    """
+
+    def __init__(self, timeout=10.0):
+        self.timeout = timeout
+        self.status = None
+        self._groups = [[]]
+        self._lock = RLock()
+
+    def put(self, signal, value, **kwargs):
+        """
+        Add a put to the batch.
+
+        Parameters
+        ----------
+        signal : Signal
+            The signal to put to.
+
+        value : any
+            The value to put.
+
+        **kwargs :
+            Passed to the signal's ``put``.
+        """
+        if self.status is not None:
+            raise RuntimeError('This batch has already been started.')
+        self._groups[-1].append((signal, value, kwargs))
+
+    def barrier(self):
+        """Wait for all earlier puts to complete before issuing later puts."""
+        if self._groups[-1]:
+            self._groups.append([])
+
+    def __len__(self):
+        return sum(len(group) for group in self._groups)
+
+    def start(self):
+        """
+        Issue the puts.
+
+        Returns
+        -------
+        status : Status
+            Finishes when all of the puts have completed, or fails with the
+            first error.
+        """
+        if self.status is not None:
+            raise RuntimeError('This batch has already been started.')
+        self.status = Status(timeout=self.timeout)
+        self._start_group(0)
+        return self.status
+
+    def _start_group(self, index):
+        groups = [group for group in self._groups if group]
+        if self.status.done:
+            return
+        if index >= len(groups):
+            self.status.set_finished()
+            return
+        group = groups[index]
+        remaining = [len(group)]
+
+        def put_done(exc=None):
+            with self._lock:
+                if self.status.done:
+                    return
+                if exc is not None:
+                    self.status.set_exception(exc)
+                    return
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self._start_group(index + 1)
+
+        for signal, value, kwargs in group:
+            self._issue(signal, value, kwargs, put_done)
+
+    @staticmethod
+    def _issue(signal, value, kwargs, put_done):
+        """Put one value, calling ``put_done`` when it completes."""
+        epics_signal = signal
+        if (isinstance(signal, _OptionalEpicsSignal)
+                and signal.should_use_epics_signal()):
+            epics_signal = signal._epics_signal
+        try:
+            if isinstance(epics_signal, EpicsSignalBase):
+                epics_signal.put(value, use_complete=True,
+                                 callback=lambda *args, **kw: put_done(),
+                                 **kwargs)
+            else:
+                signal.put(value, **kwargs)
+                put_done()
+        except Exception as ex:
+            put_done(ex)
+
+
+@contextmanager
+def put_batch(wait=True, timeout=10.0):
+    """
+    Collect puts to different signals and issue them at the same time.
+
+    This takes roughly as long as the slowest put rather than the sum of all
+    of them. Call ``barrier`` to make later puts wait for earlier ones.
+
+    Parameters
+    ----------
+    wait : bool, optional
+        If `True`, the default, wait for all of the puts to complete at the
+        end of the ``with`` block. If `False`, failed puts are logged.
+
+    timeout : float, optional
+        The time allowed for all of the puts to complete. Pass `None` to
+        allow them forever.
+
+    Yields
+    ------
+    batch : PutBatch
+        Add puts with ``batch.put(signal, value)``. After the ``with`` block,
+        ``batch.status`` is the combined status of the puts.
+
+    Examples
+    --------
+    >>> with put_batch() as batch:
+    ...     batch.put(dev.energy, 9500)
+    ...     batch.put(dev.mode, 'Floor')
+    ...     batch.barrier()
+    ...     batch.put(dev.run, 1)
+    """
+    batch = PutBatch(timeout=timeout)
+    yield batch
+    status = batch.start()
+    if wait:
+        status.wait()
+    else:
+        status.add_callback(_log_put_batch_failure)
+
+
+def _log_put_batch_failure(status):
+    """Log the error of a put batch that nobody is waiting on."""
+    if not status.success:
+        logger.error('Batched put failed: %s', status.exception())
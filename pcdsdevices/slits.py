@@ -31,7 +31,7 @@ from .interface import (BaseInterface, FltMvInterface, LightpathInOutMixin,
                         LightpathMixin, MvInterface)
 from .pmps import TwinCATStatePMPS
 from .sensors import RTD, TwinCATTempSensor
-from .signal import NotImplementedSignal, PytmcSignal
+from .signal import NotImplementedSignal, PytmcSignal, put_batch
 from .sim import FastMotor
 from .utils import get_status_float, get_status_value, schedule_task
 from .variety import set_metadata
@@ -467,15 +467,19 @@ class BeckhoffSlits(SlitsBase):
         """Wait just a moment to queue up move requests."""
         if value == 1 and old_value == 0:
             self._started_move = True
-            schedule_task(self.exec_move.put, args=(1,), delay=0.2)
+            schedule_task(self.exec_move.put, args=(1,), delay=0.2,
+                          coalesce=True)
 
     @done_all.sub_value
     def _reset_exec_move(self, *args, value, old_value, **kwargs):
         """When we're done moving, reset the exec_move signal."""
         if self._started_move and value == 1 and old_value == 0:
             self._started_move = False
-            self.exec_queue.put(0)
-            self.exec_move.put(0)
+            # Don't wait here, this runs in a callback
+            with put_batch(wait=False) as batch:
+                batch.put(self.exec_queue, 0)
+                batch.barrier()
+                batch.put(self.exec_move, 0)
 
     @done_all.sub_value
     def _dmov_fanout(self, *args, value, **kwargs):
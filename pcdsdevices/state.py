@@ -2,7 +2,9 @@
 Module to define positioners that move between discrete named states.
 """
 import functools
+import itertools
 import logging
+from concurrent.futures import wait as wait_futures
 from enum import Enum
 
 from ophyd.device import Component as Cpt
@@ -16,6 +18,7 @@ from .doc_stubs import basic_positioner_init
 from .epics_motor import IMS
 from .interface import MvInterface
 from .signal import AggregateSignal, PytmcSignal
+from .utils import get_read_executor
 from .variety import set_metadata
 
 logger = logging.getLogger(__name__)
@@ -72,6 +75,10 @@ class StatePositioner(MvInterface, Device, PositionerBase):
     _default_sub = SUB_STATE
     _state_meta_sub = EpicsSignal.SUB_VALUE
 
+    # Lookup from state values, value strings, names and aliases to states
+    _state_lookup = {}
+    _state_lookup_enum = None
+
     egu = 'state'
 
     def __init__(self, prefix, *, name, **kwargs):
@@ -100,6 +107,7 @@ class StatePositioner(MvInterface, Device, PositionerBase):
                 self._invalid_states = [self._unknown] + self._invalid_states
             if not hasattr(self, 'states_enum'):
                 self.states_enum = self._create_states_enum()
+            self._update_state_lookup()
             self._state_initialized = True
 
     def _late_state_init(self, *args, enum_strs=None, **kwargs):
@@ -243,6 +251,12 @@ class StatePositioner(MvInterface, Device, PositionerBase):
             meaningful fields, ``name`` and ``value``.
         """
 
+        if self._state_lookup_enum is not self.states_enum:
+            self._update_state_lookup()
+        try:
+            return self._state_lookup[value]
+        except (KeyError, TypeError):
+            pass
         # Check for a malformed string digit
         if isinstance(value, str) and value.isdigit():
             value = int(value)
@@ -259,6 +273,20 @@ class StatePositioner(MvInterface, Device, PositionerBase):
                 raise ValueError(err.format(value, self.name, enum_names,
                                             enum_values))
 
+    def _update_state_lookup(self):
+        """
+        Build the lookup table used by `get_state` for the current enum.
+
+        Names and aliases are added first so that, as in the enum lookups,
+        integer values and digit strings take priority over them.
+        """
+        lookup = dict(self.states_enum.__members__)
+        for state in self.states_enum:
+            lookup[state.value] = state
+            lookup[str(state.value)] = state
+        self._state_lookup = lookup
+        self._state_lookup_enum = self.states_enum
+
     def _do_move(self, state):
         """
         Execute the move command.
@@ -306,6 +334,178 @@ class StatePositioner(MvInterface, Device, PositionerBase):
         return enum
 
 
+def _evaluate_state_logic(state_logic, mode, unknown, values):
+    """
+    Interpret a `PVStatePositioner` ``_state_logic`` for one readback.
+
+    Parameters
+    ----------
+    state_logic : dict
+        The ``_state_logic`` mapping of signal name to value interpretation.
+
+    mode : {'ALL', 'FIRST'}
+        The ``_state_logic_mode``.
+
+    unknown : str
+        The name of the unknown state.
+
+    values : sequence
+        One value for each signal, in ``_state_logic`` order.
+
+    Returns
+    -------
+    state : str
+        The resulting state name.
+
+    contradiction : bool
+        `True` if two signals disagreed about the state.
+    """
+    state_value = None
+    for info, value in zip(state_logic.values(), values):
+        try:
+            signal_state = info[value]
+        # Handle unaccounted readbacks
+        except KeyError:
+            return unknown, False
+        # Associate readback with device state
+        if signal_state != 'defer':
+            if state_value:
+                # Handle inconsistent readbacks
+                if signal_state != state_value:
+                    return unknown, True
+            else:
+                # Set state to first non-deferred value
+                state_value = signal_state
+                if mode == 'FIRST':
+                    break
+    # If all states deferred, report as unknown
+    return state_value or unknown, False
+
+
+class StateLogicTable:
+    """
+    A `PVStatePositioner` ``_state_logic`` compiled into a lookup table.
+
+    Every combination of the values named in the state logic is evaluated
+    once up front, so interpreting a readback is one dictionary lookup on
+    the tuple of signal values. Values that are not named in the state logic
+    fall back to interpreting the state logic directly.
+
+    Parameters
+    ----------
+    state_logic : dict
+        The ``_state_logic`` mapping of signal name to value interpretation.
+
+    mode : {'ALL', 'FIRST'}, optional
+        The ``_state_logic_mode``.
+
+    unknown : str, optional
+        The name of the unknown state.
+
+    states : list of str, optional
+        Additional states that the logic is expected to be able to reach,
+        for example the positioner's ``states_list``.
+
+    Attributes
+    ----------
+    table : dict or None
+        Mapping from value tuples to state names. This is `None` if there
+        are more than `max_size` combinations, in which case the state logic
+        is interpreted on every lookup instead.
+
+    unreachable : list of str
+        States that no combination of values can produce.
+
+    contradictions : list of tuple
+        Value combinations where the signals disagree about the state.
+    """
+
+    max_size = 4096
+
+    def __init__(self, state_logic, mode='ALL', unknown='Unknown',
+                 states=None):
+        self.state_logic = state_logic
+        self.mode = mode
+        self.unknown = unknown
+        self.table = None
+        self.unreachable = []
+        self.contradictions = []
+
+        size = 1
+        for info in state_logic.values():
+            size *= len(info)
+        if not state_logic or size > self.max_size:
+            return
+
+        table = {}
+        for values in itertools.product(*state_logic.values()):
+            state, contradiction = _evaluate_state_logic(
+                state_logic, mode, unknown, values)
+            table[values] = state
+            if contradiction:
+                self.contradictions.append(values)
+        self.table = table
+
+        expected = [state for info in state_logic.values()
+                    for state in info.values()]
+        expected.extend(states or [])
+        reached = set(table.values())
+        for state in expected:
+            if (state not in reached and state not in (unknown, 'defer', None)
+                    and state not in self.unreachable):
+                self.unreachable.append(state)
+
+    def matches(self, state_logic, mode, unknown):
+        """Check if this table was compiled from these settings."""
+        return (state_logic is self.state_logic and mode == self.mode
+                and unknown == self.unknown)
+
+    def lookup(self, values):
+        """
+        Get the state name for a tuple of signal values.
+
+        Parameters
+        ----------
+        values : tuple
+            One value for each signal, in ``_state_logic`` order.
+
+        Returns
+        -------
+        state : str
+            The state name, or the unknown state.
+        """
+        if self.table is not None:
+            try:
+                return self.table[values]
+            except (KeyError, TypeError):
+                # Values outside the state logic, or unhashable values.
+                # These are usually unknown, but in 'FIRST' mode the later
+                # signals may not matter at all.
+                pass
+        state, _ = _evaluate_state_logic(self.state_logic, self.mode,
+                                         self.unknown, values)
+        return state
+
+    def report(self):
+        """
+        Describe the problems found in the state logic.
+
+        Returns
+        -------
+        problems : list of str
+            One message for each unreachable state and for each combination
+            of values that the signals disagree on.
+        """
+        names = list(self.state_logic)
+        problems = [f'State {state!r} can never be reached'
+                    for state in self.unreachable]
+        for values in self.contradictions:
+            readback = ', '.join(f'{name}={value!r}'
+                                 for name, value in zip(names, values))
+            problems.append(f'Contradictory states for {readback}')
+        return problems
+
+
 class PVStateSignal(AggregateSignal):
     """
     Signal that implements the `PVStatePositioner` state logic.
@@ -322,6 +522,8 @@ class PVStateSignal(AggregateSignal):
                 sig = getattr(sig, part)
             self._sub_signals.append(sig)
             self._sub_map[signal_name] = sig
+        self._logic_signals = list(self._sub_map.values())
+        self._logic_table = None
 
     def describe(self):
         # Base description information
@@ -334,32 +536,23 @@ class PVStateSignal(AggregateSignal):
         return {self.name: desc}
 
     def _calc_readback(self):
-        state_value = None
-        for signal_name, info in self.parent._state_logic.items():
-            # Get last cached value
-            value = self._cache[self._sub_map[signal_name]]
-            try:
-                signal_state = info[value]
-            # Handle unaccounted readbacks
-            except KeyError:
-                state_value = self.parent._unknown
-                break
-            # Associate readback with device state
-            if signal_state != 'defer':
-                if state_value:
-                    # Handle inconsistent readbacks
-                    if signal_state != state_value:
-                        state_value = self.parent._unknown
-                        break
-                else:
-                    # Set state to first non-deferred value
-                    state_value = signal_state
-                    if self.parent._state_logic_mode == 'ALL':
-                        continue
-                    elif self.parent._state_logic_mode == 'FIRST':
-                        break
-        # If all states deferred, report as unknown
-        return state_value or self.parent._unknown
+        parent = self.parent
+        logic_table = self._logic_table
+        # Recompile if the state logic or mode was changed on the instance
+        if (logic_table is None
+                or logic_table.state_logic is not parent._state_logic
+                or logic_table.mode != parent._state_logic_mode
+                or logic_table.unknown != parent._unknown):
+            logic_table = parent._get_state_logic_table()
+            self._logic_table = logic_table
+        # Get last cached values, in _state_logic order
+        cache = self._cache
+        values = tuple([cache[sig] for sig in self._logic_signals])
+        try:
+            return logic_table.table[values]
+        except (KeyError, TypeError):
+            # Not compiled, or not in the table
+            return logic_table.lookup(values)
 
     def put(self, value, **kwargs):
         self.parent.move(value, **kwargs)
@@ -394,6 +587,10 @@ class PVStatePositioner(StatePositioner):
         This is for cases where the logic is simple. If there are more complex
         requirements, replace the `state` component.
 
+        The logic is compiled into a `StateLogicTable` when the class is
+        created. Unreachable and contradictory states are logged at debug
+        level.
+
     _state_logic_mode : {'ALL', 'FIRST'}
         This should be 'ALL' (default) if the pvs need to agree for a valid
         state. You can set this to 'FIRST' instead to use the first state
@@ -407,6 +604,28 @@ class PVStatePositioner(StatePositioner):
 
     _state_logic = {}
     _state_logic_mode = 'ALL'
+    _state_logic_table = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls._state_logic:
+            cls._state_logic_table = StateLogicTable(
+                cls._state_logic, mode=cls._state_logic_mode,
+                unknown=cls._unknown, states=cls.states_list)
+            for problem in cls._state_logic_table.report():
+                logger.debug('%s: %s', cls.__name__, problem)
+
+    def _get_state_logic_table(self):
+        """Get the compiled state logic, recompiling it if it was changed."""
+        table = self._state_logic_table
+        if table is None or not table.matches(self._state_logic,
+                                              self._state_logic_mode,
+                                              self._unknown):
+            table = StateLogicTable(
+                self._state_logic, mode=self._state_logic_mode,
+                unknown=self._unknown, states=self.states_list)
+            self._state_logic_table = table
+        return table
 
     def __init__(self, prefix, *, name, **kwargs):
         if self.__class__ is PVStatePositioner:
@@ -553,6 +772,66 @@ class TwinCATStateConfigAll(Device):
     state04 = Cpt(TwinCATStateConfigOne, ':04', kind='omitted')
     state05 = Cpt(TwinCATStateConfigOne, ':05', kind='omitted')
 
+    snapshot_fields = ('state_name', 'setpoint', 'delta', 'velo')
+
+    def snapshot(self, fields=None, timeout=None):
+        """
+        Read the configuration of every state at once.
+
+        All of the reads are started together, so this takes about as long
+        as the slowest single read rather than the sum of all of them.
+
+        Parameters
+        ----------
+        fields : list of str, optional
+            The `TwinCATStateConfigOne` signals to read. Defaults to
+            `snapshot_fields`.
+
+        timeout : float, optional
+            The total time to wait for all of the reads. This is also passed
+            to each signal's ``get``.
+
+        Returns
+        -------
+        table : list of dict
+            One row per state, in order, with a ``state`` key for the
+            component name and one key per field. Fields that could not be
+            read in time are `None`.
+        """
+        if fields is None:
+            fields = self.snapshot_fields
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+
+        executor = get_read_executor()
+        futures = {}
+        for state in self.component_names:
+            config = getattr(self, state)
+            for field in fields:
+                sig = getattr(config, field)
+                futures[(state, field)] = executor.submit(sig.get, **kwargs)
+        done, _ = wait_futures(futures.values(), timeout=timeout)
+
+        table = []
+        for state in self.component_names:
+            row = {'state': state}
+            for field in fields:
+                future = futures[(state, field)]
+                row[field] = None
+                if future not in done:
+                    future.cancel()
+                    logger.debug('%s timed out reading %s.%s', self.name,
+                                 state, field)
+                    continue
+                try:
+                    row[field] = future.result()
+                except TimeoutError:
+                    logger.debug('%s timed out reading %s.%s', self.name,
+                                 state, field)
+            table.append(row)
+        return table
+
 
 class TwinCATStatePositioner(StatePositioner):
     """
@@ -601,8 +880,9 @@ class TwinCATStatePositioner(StatePositioner):
     reset_cmd = Cpt(PytmcSignal, ':RESET', io='o', kind='normal',
                     doc='Command to reset an error.')
 
-    config = Cpt(TwinCATStateConfigAll, '', kind='omitted',
-                 doc='Configuration of state positions, deltas, etc.')
+    config = Cpt(TwinCATStateConfigAll, '', kind='omitted', lazy=True,
+                 doc='Configuration of state positions, deltas, etc. '
+                     'This is only created when first used.')
 
     set_metadata(error_id, dict(variety='scalar', display_format='hex'))
     set_metadata(reset_cmd, dict(variety='command', value=1))
@@ -1,3 +1,7 @@
+import functools
+import heapq
+import itertools
+import logging
 import operator
 import os
 import select
@@ -5,10 +9,11 @@ import shutil
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 
+import numpy as np
 import ophyd
-import pint
 import prettytable
 
 try:
@@ -18,6 +23,7 @@ except ImportError:
     tty = None
     termios = None
 
+logger = logging.getLogger(__name__)
 
 arrow_up = '\x1b[A'
 arrow_down = '\x1b[B'
@@ -92,6 +98,191 @@ def get_input():
 
 
 ureg = None
+_ureg_lock = threading.Lock()
+# Where pint caches its parsed definitions, see get_unit_registry
+unit_cache_folder = ':auto:'
+
+
+def get_unit_registry():
+    """
+    Get the pint unit registry shared by pcdsdevices.
+
+    The registry is created on first use rather than on import, and pint's
+    on-disk cache (see ``unit_cache_folder``) is used when available so
+    that later sessions do not need to parse the unit definitions again.
+    Quantities from this registry can be used with pcdsdevices signals and
+    in user code.
+
+    Returns
+    -------
+    ureg : pint.UnitRegistry
+    """
+    global ureg
+    if ureg is None:
+        with _ureg_lock:
+            if ureg is None:
+                ureg = _make_unit_registry()
+    return ureg
+
+
+def _make_unit_registry():
+    import pint
+    if unit_cache_folder is not None:
+        try:
+            return pint.UnitRegistry(cache_folder=unit_cache_folder)
+        except Exception:
+            # Older pint or no writable cache directory
+            logger.debug('Could not use the pint cache in %s',
+                         unit_cache_folder, exc_info=True)
+    return pint.UnitRegistry()
+
+
+read_executor = None
+_read_executor_lock = threading.Lock()
+_read_worker = threading.local()
+
+
+def get_read_executor():
+    """
+    Get the thread pool shared by pcdsdevices for concurrent signal reads.
+
+    The pool is created on first use. Code that is already running in the
+    pool should read serially instead of submitting more reads and waiting
+    on them, see `in_read_executor`.
+
+    Returns
+    -------
+    executor : concurrent.futures.ThreadPoolExecutor
+    """
+    global read_executor
+    if read_executor is None:
+        with _read_executor_lock:
+            if read_executor is None:
+                read_executor = ThreadPoolExecutor(
+                    max_workers=16,
+                    thread_name_prefix='pcdsdevices_read',
+                    initializer=_init_read_worker,
+                )
+    return read_executor
+
+
+def _init_read_worker():
+    _read_worker.active = True
+
+
+def in_read_executor():
+    """Return `True` if called from one of the shared read threads."""
+    return getattr(_read_worker, 'active', False)
+
+
+class UnitConverter:
+    """
+    Converts values from one unit to another.
+
+    Most unit conversions are affine, ``new_value = scale * value + offset``,
+    so the scale and offset are found once using pint and reused for every
+    conversion. Conversions that are not affine fall back to pint each time.
+    Use :func:`get_unit_converter` to get a cached instance.
+
+    Parameters
+    ----------
+    unit : str
+        The starting unit for the conversion.
+
+    new_unit : str
+        The desired unit for the conversion.
+
+    Attributes
+    ----------
+    scale : float or None
+        The conversion scale, or `None` if the conversion is not affine.
+
+    offset : float or None
+        The conversion offset, or `None` if the conversion is not affine.
+    """
+
+    # Points used to check that a conversion is affine
+    _check_points = (-1000.0, 2.5, 1000.0)
+
+    def __init__(self, unit, new_unit):
+        self._ureg = get_unit_registry()
+        self.unit = unit
+        self.new_unit = new_unit
+        self._expr = self._ureg.parse_expression(unit)
+        self.scale = None
+        self.offset = None
+        offset = self._pint_convert(0.0)
+        scale = self._pint_convert(1.0) - offset
+        for point in self._check_points:
+            if not np.isclose(self._pint_convert(point),
+                              scale * point + offset,
+                              rtol=1e-12, atol=0):
+                break
+        else:
+            self.scale = scale
+            self.offset = offset
+
+    @property
+    def affine(self):
+        """`True` if the conversion does not need pint."""
+        return self.scale is not None
+
+    def _pint_convert(self, value):
+        from pint.errors import OffsetUnitCalculusError
+        try:
+            quantity = value * self._expr
+        except OffsetUnitCalculusError:
+            quantity = self._ureg.Quantity(value, self.unit)
+        return quantity.to(self.new_unit).magnitude
+
+    def __call__(self, value):
+        """
+        Convert a value.
+
+        Parameters
+        ----------
+        value : float or numpy.ndarray
+            The value or values to convert.
+
+        Returns
+        -------
+        new_value : float or numpy.ndarray
+            The value or values in the new unit.
+        """
+        if self.scale is None:
+            if isinstance(value, (list, tuple)):
+                value = np.asarray(value)
+            return self._pint_convert(value)
+        if isinstance(value, (list, tuple)):
+            value = np.asarray(value)
+        if self.offset:
+            return value * self.scale + self.offset
+        return value * self.scale
+
+    def __repr__(self):
+        return (f'<{type(self).__name__} {self.unit!r} -> {self.new_unit!r} '
+                f'scale={self.scale} offset={self.offset}>')
+
+
+@functools.lru_cache(maxsize=None)
+def get_unit_converter(unit, new_unit):
+    """
+    Get a cached converter from one unit to another.
+
+    Parameters
+    ----------
+    unit : str
+        The starting unit for the conversion.
+
+    new_unit : str
+        The desired unit for the conversion.
+
+    Returns
+    -------
+    converter : UnitConverter
+        Call this with a value to convert it.
+    """
+    return UnitConverter(unit, new_unit)
 
 
 def convert_unit(value, unit, new_unit):
@@ -100,7 +291,7 @@ def convert_unit(value, unit, new_unit):
 
     Parameters
     ----------
-    value : float
+    value : float or numpy.ndarray
         The starting value for the conversion.
 
     unit : str
@@ -111,16 +302,11 @@ def convert_unit(value, unit, new_unit):
 
     Returns
     -------
-    new_value : float
+    new_value : float or numpy.ndarray
         The starting value, but converted to the new unit.
     """
 
-    global ureg
-    if ureg is None:
-        ureg = pint.UnitRegistry()
-
-    expr = ureg.parse_expression(unit)
-    return (value * expr).to(new_unit).magnitude
+    return get_unit_converter(unit, new_unit)(value)
 
 
 def ipm_screen(dettype, prefix, prefix_ioc):
@@ -172,7 +358,217 @@ def get_component(obj):
     return getattr(type(obj.parent), obj.attr_name, None)
 
 
-def schedule_task(func, args=None, kwargs=None, delay=None):
+class ScheduledTask:
+    """
+    Handle for a task that was scheduled to run later.
+
+    Returned by :func:`schedule_task` and :meth:`TaskScheduler.schedule`.
+    """
+
+    def __init__(self, scheduler, func, args, kwargs, deadline, key):
+        self._scheduler = scheduler
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.key = key
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        """
+        Keep the task from running, if it has not started yet.
+
+        Returns
+        -------
+        cancelled : bool
+            `True` if the task will not run.
+        """
+        return self._scheduler.cancel(self)
+
+    def __repr__(self):
+        return (f'<{type(self).__name__} {self.func!r} '
+                f'cancelled={self.cancelled} done={self.done}>')
+
+
+class TaskScheduler:
+    """
+    A single thread that runs tasks after a delay.
+
+    Tasks are kept in a heap sorted by deadline, so one thread can handle
+    any number of delayed tasks. The thread is started with the first task.
+    Tasks should be quick, since they run one after another; use
+    :func:`schedule_task` to hand slow work to ophyd's dispatcher instead.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the scheduler thread.
+    """
+
+    def __init__(self, name='pcdsdevices_scheduler'):
+        self.name = name
+        self._cond = threading.Condition()
+        self._heap = []
+        self._pending = {}
+        self._counter = itertools.count()
+        self._thread = None
+        self._depth = 0
+        self._stats = dict(scheduled=0, executed=0, cancelled=0,
+                           coalesced=0, errors=0, max_depth=0,
+                           total_lateness=0.0, max_lateness=0.0)
+
+    def schedule(self, func, args=None, kwargs=None, delay=0, coalesce=False):
+        """
+        Run ``func(*args, **kwargs)`` in the scheduler thread after a delay.
+
+        Parameters
+        ----------
+        func : callable
+            The function to call.
+
+        args : tuple, optional
+            Positional arguments for the function.
+
+        kwargs : dict, optional
+            Keyword arguments for the function.
+
+        delay : float, optional
+            The time to wait in seconds.
+
+        coalesce : bool, optional
+            If `True` and the same function with the same arguments is
+            already waiting to run, don't schedule it again and return the
+            pending task instead.
+
+        Returns
+        -------
+        task : ScheduledTask
+        """
+        args = tuple(args or ())
+        kwargs = dict(kwargs or {})
+        key = None
+        if coalesce:
+            key = (func, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+        deadline = time.monotonic() + delay
+        with self._cond:
+            if key is not None and key in self._pending:
+                self._stats['coalesced'] += 1
+                return self._pending[key]
+            task = ScheduledTask(self, func, args, kwargs, deadline, key)
+            if key is not None:
+                self._pending[key] = task
+            heapq.heappush(self._heap, (deadline, next(self._counter), task))
+            self._depth += 1
+            self._stats['scheduled'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'],
+                                           self._depth)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name=self.name, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is task:
+                # New earliest deadline, wake the thread up
+                self._cond.notify()
+        return task
+
+    def cancel(self, task):
+        """
+        Keep a task from running, if it has not started yet.
+
+        Returns
+        -------
+        cancelled : bool
+            `True` if the task will not run.
+        """
+        with self._cond:
+            if task.done:
+                return False
+            if not task.cancelled:
+                task.cancelled = True
+                self._depth -= 1
+                self._stats['cancelled'] += 1
+                if self._pending.get(task.key) is task:
+                    del self._pending[task.key]
+            return True
+
+    @property
+    def queue_depth(self):
+        """The number of tasks waiting to run."""
+        return self._depth
+
+    def metrics(self):
+        """
+        Information about the tasks this scheduler has handled.
+
+        Returns
+        -------
+        metrics : dict
+            Includes the current ``queue_depth``, counts of tasks that were
+            ``scheduled``, ``executed``, ``cancelled`` and ``coalesced``,
+            and the ``mean_lateness`` and ``max_lateness`` in seconds of
+            the executed tasks compared to their deadlines.
+        """
+        with self._cond:
+            metrics = dict(self._stats)
+            metrics['queue_depth'] = self._depth
+        executed = metrics['executed']
+        total = metrics.pop('total_lateness')
+        metrics['mean_lateness'] = total / executed if executed else 0.0
+        return metrics
+
+    def reset_metrics(self):
+        """Reset all of the counters in :meth:`metrics`."""
+        with self._cond:
+            for key in self._stats:
+                self._stats[key] = type(self._stats[key])(0)
+
+    def _pop_due(self):
+        """Wait for the next task that should run and take it off the heap."""
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, task = self._heap[0]
+                now = time.monotonic()
+                if deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                task.done = True
+                self._depth -= 1
+                if self._pending.get(task.key) is task:
+                    del self._pending[task.key]
+                lateness = now - deadline
+                self._stats['executed'] += 1
+                self._stats['total_lateness'] += lateness
+                self._stats['max_lateness'] = max(
+                    self._stats['max_lateness'], lateness
+                )
+                return task
+
+    def _run(self):
+        while True:
+            task = self._pop_due()
+            try:
+                task.func(*task.args, **task.kwargs)
+            except Exception:
+                with self._cond:
+                    self._stats['errors'] += 1
+                logger.exception('Error in scheduled task %s', task)
+
+
+scheduler = TaskScheduler()
+
+
+def schedule_task(func, args=None, kwargs=None, delay=None, coalesce=False):
     """
     Use ophyd's dispatcher to schedule a task for later.
 
@@ -180,6 +576,33 @@ def schedule_task(func, args=None, kwargs=None, delay=None):
     Schedules a task for the utility thread if we're in some arbitrary thread,
     schedules a task for the same thread if we're in one of ophyd's callback
     queues already.
+
+    Delayed tasks wait in the shared `scheduler` rather than in a new
+    thread for each call.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call.
+
+    args : tuple, optional
+        Positional arguments for the function.
+
+    kwargs : dict, optional
+        Keyword arguments for the function.
+
+    delay : float, optional
+        If provided, wait this many seconds before queueing the task.
+
+    coalesce : bool, optional
+        If `True`, don't schedule a delayed task again if the same function
+        with the same arguments is already waiting.
+
+    Returns
+    -------
+    task : ScheduledTask or None
+        A handle that can be used to cancel a delayed task, or `None` if
+        there was no delay.
     """
     if args is None:
         args = ()
@@ -189,30 +612,41 @@ def schedule_task(func, args=None, kwargs=None, delay=None):
     dispatcher = ophyd.cl.get_dispatcher()
 
     # Check if we're already in an ophyd dispatcher thread
-    current_thread = threading.currentThread()
-    matched_thread = None
+    current_thread = threading.current_thread()
+    context = None
     for name, thread in dispatcher.threads.items():
         if thread == current_thread:
-            matched_thread = name
-            context = dispatcher.get_thread_context(matched_thread)
+            context = dispatcher.get_thread_context(name)
             break
 
-    def schedule():
-        if matched_thread is None:
-            # Put into utility queue
-            dispatcher.schedule_utility_task(func, *args, **kwargs)
-        else:
-            # Put into same queue
-            if context.event_thread is not None:
-                context.event_thread.queue.put((func, args, kwargs))
-
     if delay is None:
         # Do it right away
-        schedule()
+        _dispatch(dispatcher, context, func, args, kwargs)
+        return None
+    # Do it later
+    return scheduler.schedule(
+        _dispatch, args=(dispatcher, context, func, tuple(args)),
+        kwargs=dict(kwargs=_HashableDict(kwargs)), delay=delay,
+        coalesce=coalesce,
+    )
+
+
+class _HashableDict(dict):
+    """Keyword arguments that can be compared when coalescing tasks."""
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.items())))
+
+
+def _dispatch(dispatcher, context, func, args, kwargs):
+    """Put a task into one of ophyd's callback queues."""
+    if context is None:
+        # Put into utility queue
+        dispatcher.schedule_utility_task(func, *args, **kwargs)
     else:
-        # Do it later
-        timer = threading.Timer(delay, schedule)
-        timer.start()
+        # Put into same queue
+        if context.event_thread is not None:
+            context.event_thread.queue.put((func, args, kwargs))
 
 
 def get_status_value(status_info, *keys, default_value='N/A'):
@@ -1,14 +1,19 @@
+import itertools
 import logging
 import threading
 import time
 from unittest.mock import Mock
 
+import numpy as np
 import pytest
 from ophyd.sim import make_fake_device
 from ophyd.status import wait as status_wait
 
 from pcdsdevices.attenuator import (AT1K4, AT2L0, MAX_FILTERS, AttBase,
-                                    Attenuator, _att_classes)
+                                    Attenuator, AttenuatorCoordinator,
+                                    AttenuatorSolver, _att_classes,
+                                    _group_by_motions, _search_motion_groups,
+                                    filter_transmission)
 
 logger = logging.getLogger(__name__)
 
@@ -195,3 +200,147 @@ def test_new_attenuator_smoke(fake_new_attenuator):
             fake_new_attenuator.status_info()
         )
     )
+
+
+def fake_transmission(material, thickness, energy):
+    return np.exp(-thickness / energy)
+
+
+def test_attenuator_solver():
+    blades = [[('Si', 10)], [('Si', 20)], [('C', 40)], [('C', 80)]]
+    solver = AttenuatorSolver(blades, transmission_func=fake_transmission)
+    transmissions = solver.transmissions(100)
+    assert len(transmissions) == 2 ** 4
+    # Compare against checking every configuration by hand
+    configs = list(itertools.product((0, 1), repeat=4))
+    for index, config in enumerate(configs):
+        assert solver.get_config(index) == config
+        thickness = sum(blade[0][1] for blade, pos in zip(blades, config)
+                        if pos)
+        assert transmissions[index] == pytest.approx(np.exp(-thickness / 100))
+
+    solution = solver.solve(0.5, 100)
+    assert solution.floor.transmission <= 0.5 <= solution.ceiling.transmission
+    assert solution.floor.transmission == max(t for t in transmissions
+                                              if t <= 0.5)
+    assert solution.ceiling.transmission == min(t for t in transmissions
+                                                if t >= 0.5)
+    assert solution.best in (solution.floor, solution.ceiling)
+    # Out of range: fall back to the closest configuration
+    assert solver.solve(2, 100).floor.config == (0, 0, 0, 0)
+    assert solver.solve(0, 100).ceiling.config == (1, 1, 1, 1)
+
+    # Energies in the same bin share a calculation
+    assert solver.transmissions(100.2) is transmissions
+    for energy in range(200, 200 + solver.cache_size):
+        solver.transmissions(energy)
+    assert solver.transmissions(100) is not transmissions
+
+
+def test_attenuator_solver_ladder():
+    blades = [[('Al', 10), None, ('Al', 30)], [('Al', 20)]]
+    solver = AttenuatorSolver(blades, fixed={1: 1},
+                              transmission_func=fake_transmission)
+    assert solver.shape == (3, 1)
+    configs = {solver.get_config(index) for index in range(3)}
+    assert configs == {(0, 1), (1, 1), (3, 1)}
+    assert solver.solve(1, 10).best == (
+        (0, 1), pytest.approx(np.exp(-2)))
+
+
+def test_attenuator_solver_from_device(fake_att):
+    for filt in fake_att.filters:
+        filt.material.put('Si')
+    fake_att.filters[0].stuck.put(1)
+    solver = AttenuatorSolver.from_device(fake_att)
+    assert solver.blades[1] == [('Si', 2)]
+    assert solver.shape == (1,) + (2,) * (len(fake_att.filters) - 1)
+    assert solver.solve(1, 8000).best.config[0] == 1
+
+
+def test_filter_transmission():
+    assert filter_transmission('Si', 100, 8000) == pytest.approx(0.2258,
+                                                                 rel=1e-2)
+
+
+def test_attenuator_joint_search():
+    first = AttenuatorSolver([[('Si', 10)], [('Si', 25)], [('Si', 70)]],
+                             transmission_func=fake_transmission)
+    second = AttenuatorSolver([[('C', 5), ('C', 15), ('C', 45)],
+                               [('C', 30), ('C', 90)]],
+                              transmission_func=fake_transmission)
+    currents = [(1, 0, 0), (2, 0)]
+    solvers = [first, second]
+    groups = [_group_by_motions(solver.transmissions(100),
+                                solver.motions(current))
+              for solver, current in zip(solvers, currents)]
+    options = [
+        [(solver.transmissions(100)[idx], solver.motions(current)[idx], idx)
+         for idx in range(len(solver.transmissions(100)))]
+        for solver, current in zip(solvers, currents)
+    ]
+    tolerance = np.log1p(0.05)
+    for goal in (1, 0.7, 0.3, 0.05, 0.001, 1e-9):
+        log_goal = np.log(goal)
+        error, _, motions, indices = _search_motion_groups(
+            groups, log_goal, tolerance)
+        # Brute force: fewest motions within tolerance, else closest
+        combos = [(abs(np.log(a[0] * b[0]) - log_goal), a[1] + b[1])
+                  for a, b in itertools.product(*options)]
+        good = [combo for combo in combos if combo[0] <= tolerance]
+        if good:
+            assert motions == min(combo[1] for combo in good)
+            assert error == pytest.approx(min(
+                combo[0] for combo in good if combo[1] == motions))
+        else:
+            assert error == pytest.approx(min(combo[0] for combo in combos))
+        assert motions == sum(solver.motions(current)[idx] for
+                              solver, current, idx in
+                              zip(solvers, currents, indices))
+
+
+@pytest.mark.timeout(5)
+def test_attenuator_coordinator(fake_att):
+    for idx, filt in enumerate(fake_att.filters):
+        filt.material.put('Si')
+        filt.thickness.put(10 * 2 ** idx)
+        filt.state.put(2)
+    FakeAT1K4 = make_fake_device(AT1K4)
+    ladder = FakeAT1K4('AT1K4:', calculator_prefix='AT1K4:CALC',
+                       name='fake_at1k4')
+    for index, blade in ladder.calculator.filters_by_index.items():
+        for num, attr in blade._filter_index_to_attr.items():
+            filt = getattr(blade, attr)
+            filt.material.put('C')
+            filt.thickness.put(num * index)
+            filt.active.put(1)
+        state = getattr(ladder, f'blade_{index:02}').state
+        state.state.sim_set_enum_strs(['Unknown', 'Out'] + [
+            f'In_{num:02}' for num in range(1, 9)])
+        state.state.sim_put(1)
+
+    coordinator = AttenuatorCoordinator(fake_att, ladder,
+                                        transmission_func=fake_transmission)
+    assert coordinator.plan(1, energy=1000).motions == 0
+    plan = coordinator.plan(0.5, energy=1000)
+    assert plan.transmission == pytest.approx(0.5, rel=0.05)
+    assert plan.motions > 0
+    status = coordinator.set(0.5, energy=1000, wait=True, timeout=1)
+    assert status.done and status.success
+    assert coordinator.get_current_configs() == list(plan.configs)
+    # Already there, so nothing moves
+    assert coordinator.plan(0.5, energy=1000).motions == 0
+
+    # Stuck blades are held where they are, even at an inactive filter
+    first, blade = sorted(ladder.calculator.filters_by_index.items())[0]
+    getattr(ladder, f'blade_{first:02}').state.state.sim_put(3)
+    blade.filter_02.is_stuck.put(1)
+    blade.filter_02.active.put(0)
+    coordinator.refresh()
+    assert coordinator.solvers[1].fixed == {0: 2}
+    best = coordinator.solvers[1].solve(1, 1000).best
+    assert best.config[0] == 2
+    assert best.transmission == pytest.approx(np.exp(-2 * first / 1000))
+    assert coordinator.plan(1, energy=1000).configs[1][0] == 2
+    coordinator.set(1, energy=1000, wait=True, timeout=1)
+    assert coordinator.get_current_configs()[1][0] == 2
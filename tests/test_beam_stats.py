@@ -1,9 +1,11 @@
 import logging
 
+import numpy as np
 import pytest
+from ophyd.signal import Signal
 from ophyd.sim import make_fake_device
 
-from pcdsdevices.beam_stats import BeamStats, LCLS
+from pcdsdevices.beam_stats import LCLS, BeamStats, SignalBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,55 @@ def test_beam_stats_disconnected():
     BeamStats()
 
 
+def test_signal_buffer():
+    logger.debug('test_signal_buffer')
+    mj = Signal(name='mj')
+    ev = Signal(name='ev')
+    buffer = SignalBuffer(dict(mj=mj, ev=ev), size=5)
+    assert buffer.nbytes == 2 * 2 * 5 * 8
+    with buffer:
+        for num in range(8):
+            mj.put(float(num), timestamp=100 + num)
+            ev.put(1000.0 + 10 * num, timestamp=100 + num + 0.2)
+    mj.put(-1.0, timestamp=200)
+    assert not buffer.running
+
+    times, values = buffer.column('mj')
+    np.testing.assert_array_equal(values, [3, 4, 5, 6, 7])
+    np.testing.assert_array_equal(times, [103, 104, 105, 106, 107])
+
+    aligned = buffer.align()
+    np.testing.assert_array_equal(aligned['ev'], [1030, 1040, 1050, 1060,
+                                                  1070])
+    aligned = buffer.align(method='previous')
+    np.testing.assert_array_equal(aligned['ev'][1:], [1030, 1040, 1050,
+                                                      1060])
+    assert np.isnan(aligned['ev'][0])
+    assert np.all(np.isnan(buffer.align(method='exact')['ev']))
+    aligned = buffer.align(method='exact', tolerance=0.5)
+    np.testing.assert_array_equal(aligned['ev'], [1030, 1040, 1050, 1060,
+                                                  1070])
+
+    assert buffer.correlate('mj', 'ev', tolerance=0.5) == pytest.approx(1)
+    binned = buffer.bin('ev', 'mj', bins=[1025, 1045, 1065, 1085],
+                        tolerance=0.5)
+    np.testing.assert_array_equal(binned['count'], [2, 2, 1])
+    np.testing.assert_array_equal(binned['mean'], [3.5, 5.5, 7])
+    np.testing.assert_array_equal(binned['centers'], [1035, 1055, 1075])
+
+
+def test_beam_stats_buffer(fake_beam_stats):
+    logger.debug('test_beam_stats_buffer')
+    stats = fake_beam_stats
+    buffer = stats.make_buffer(max_bytes=4800)
+    assert buffer.names == ['mj', 'ev', 'rate']
+    assert buffer.size == 100
+    for num in range(3):
+        stats.mj.sim_put(num)
+    assert len(buffer.column('mj')[1]) == 3
+    buffer.stop()
+
+
 @pytest.fixture(scope='function')
 def fake_lcls():
     FakeLcls = make_fake_device(LCLS)
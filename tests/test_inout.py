@@ -1,4 +1,5 @@
 import logging
+import math
 from unittest.mock import Mock
 
 import pytest
@@ -39,6 +40,24 @@ def test_inout_trans(fake_inout):
     assert inout.transmission == 1
 
 
+def test_inout_check_states(fake_inout):
+    logger.debug('test_inout_check_states')
+    inout = fake_inout
+    # Names, values and digit strings all resolve to the same state
+    for state in ('IN', 1, '1'):
+        assert inout.get_state(state) is inout.states_enum.IN
+        assert inout.check_inserted(state)
+        assert not inout.check_removed(state)
+        assert inout.check_transmission(state) == 0
+    assert inout.check_removed('OUT')
+    assert inout.check_transmission(2) == 1
+    assert not inout.check_inserted('Unknown')
+    assert not inout.check_removed('Unknown')
+    assert math.isnan(inout.check_transmission(0))
+    with pytest.raises(ValueError):
+        inout.check_inserted('asdf')
+
+
 def test_inout_motion(fake_inout):
     logger.debug('test_inout_motion')
     inout = fake_inout
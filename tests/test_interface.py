@@ -1,4 +1,5 @@
 import fcntl
+import io
 import logging
 import multiprocessing as mp
 import os
@@ -10,9 +11,13 @@ import conftest
 import ophyd
 import pytest
 
+import pcdsdevices.interface
 from pcdsdevices.interface import (BaseInterface, TabCompletionHelperClass,
-                                   get_engineering_mode, set_engineering_mode,
-                                   setup_preset_paths)
+                                   get_engineering_mode,
+                                   get_sqlite_preset_store, preset_index,
+                                   preset_states, preset_writer, redraw_lines,
+                                   set_engineering_mode, setup_preset_paths,
+                                   start_preset_watcher, stop_preset_watcher)
 from pcdsdevices.sim import FastMotor, SlowMotor
 
 logger = logging.getLogger(__name__)
@@ -158,9 +163,10 @@ def test_presets(presets, fast_motor):
 
         assert fast_motor.presets.positions.sample.pos == 3
         fast_motor.presets.positions.sample.update_pos(2)
-        assert not hasattr(fast_motor, 'wm_sample')
+        # The locked presets are kept instead of being dropped
+        assert hasattr(fast_motor, 'wm_sample')
         fast_motor.presets.sync()
-        assert not hasattr(fast_motor, 'mv_sample')
+        assert hasattr(fast_motor, 'mv_sample')
 
     proc.join()
 
@@ -168,6 +174,242 @@ def test_presets(presets, fast_motor):
     assert hasattr(fast_motor, 'mv_sample')
 
 
+def test_preset_index(presets, fast_motor, monkeypatch):
+    logger.debug('test_preset_index')
+    monkeypatch.setattr(preset_index, 'racy_window', 0)
+    fast_motor.presets.add_hutch('four', 4)
+    path = fast_motor.presets.positions.four.path
+
+    loads = []
+    orig_load = pcdsdevices.interface.yaml.load
+
+    def counting_load(*args, **kwargs):
+        loads.append(args)
+        return orig_load(*args, **kwargs)
+
+    monkeypatch.setattr(pcdsdevices.interface.yaml, 'load', counting_load)
+    # Unchanged file is served from the index
+    fast_motor.presets.sync()
+    fast_motor.presets.sync()
+    other = FastMotor(name='no_presets')
+    assert not other.presets.has_presets
+    assert len(loads) == 0
+
+    # Changes from outside are picked up on the next sync
+    with open(path, 'a') as f:
+        f.write('five:\n  active: true\n  value: 5\n')
+    fast_motor.presets.sync()
+    assert len(loads) == 1
+    assert fast_motor.wm_five() == 5 - fast_motor.wm()
+
+
+@pytest.mark.timeout(10)
+def test_presets_no_wait(presets, fast_motor, monkeypatch):
+    logger.debug('test_presets_no_wait')
+    fast_motor.presets.add_hutch('zero', 0)
+    path = fast_motor.presets.positions.zero.path
+
+    saves = []
+    orig_save = fast_motor.presets._save
+
+    def slow_save(preset_type, updates):
+        saves.append(len(updates))
+        time.sleep(0.2)
+        orig_save(preset_type, updates)
+
+    monkeypatch.setattr(fast_motor.presets, '_save', slow_save)
+    # Available right away, written in the background
+    fast_motor.presets.add_hutch('one', 1, wait=False)
+    assert fast_motor.presets.positions.one.pos == 1
+    for num in range(2, 6):
+        fast_motor.presets.positions.one.update_pos(num, wait=False)
+    fast_motor.presets.positions.zero.deactivate(wait=False)
+    assert fast_motor.presets.positions.one.pos == 5
+    assert not hasattr(fast_motor, 'wm_zero')
+    assert preset_writer.flush(timeout=5)
+    # The writes were combined
+    assert sum(saves) == 6
+    assert len(saves) <= 2
+
+    other = FastMotor(name=fast_motor.name)
+    assert other.presets.positions.one.pos == 5
+    assert not hasattr(other, 'wm_zero')
+    with open(path) as f:
+        assert 'one' in f.read()
+
+
+def test_presets_lock_thread(presets, fast_motor):
+    logger.debug('test_presets_lock_thread')
+    fast_motor.presets.add_hutch('zero', 0)
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with fast_motor.presets._file_open_rlock('hutch'):
+            locked.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    locked.wait()
+    try:
+        # Other threads time out instead of hanging
+        fast_motor.presets.positions.zero.update_pos(1)
+        # The update fails, but the presets we could not read are kept
+        assert hasattr(fast_motor, 'wm_zero')
+        assert fast_motor.presets.positions.zero.pos == 0
+    finally:
+        release.set()
+        thread.join()
+    fast_motor.presets.sync()
+    assert fast_motor.presets.positions.zero.pos == 0
+    fast_motor.presets.positions.zero.update_pos(1)
+    assert fast_motor.presets.positions.zero.pos == 1
+
+
+@pytest.mark.timeout(20)
+def test_presets_sync_threads(presets, fast_motor):
+    logger.debug('test_presets_sync_threads')
+    errors = []
+
+    def sync_many():
+        try:
+            for _ in range(20):
+                fast_motor.presets.sync()
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=sync_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for num in range(10):
+        fast_motor.presets.add_hutch(f'pos{num}', num, wait=False)
+    fast_motor.presets.positions.pos0.deactivate()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    preset_writer.flush(timeout=5)
+    fast_motor.presets.sync()
+    for num in range(1, 10):
+        assert getattr(fast_motor.presets.positions, f'pos{num}').pos == num
+        assert hasattr(fast_motor, f'wm_pos{num}')
+    assert not hasattr(fast_motor, 'wm_pos0')
+
+
+@pytest.mark.timeout(10)
+@pytest.mark.parametrize('use_inotify', [False, True])
+def test_preset_watcher(presets, fast_motor, use_inotify):
+    logger.debug('test_preset_watcher')
+    if use_inotify and pcdsdevices.interface.inotify_simple is None:
+        pytest.skip('inotify_simple is not installed')
+    fast_motor.presets.add_hutch('four', 4)
+    path = fast_motor.presets.positions.four.path
+    other = FastMotor(name='sim_other')
+    other.presets
+    wm_four = fast_motor.wm_four
+
+    start_preset_watcher(poll_interval=0.1, use_inotify=use_inotify)
+    try:
+        time.sleep(0.3)
+        with open(path, 'a') as f:
+            f.write('five:\n  active: true\n  value: 5\n')
+        while not hasattr(fast_motor, 'wm_five'):
+            time.sleep(0.05)
+    finally:
+        stop_preset_watcher()
+    # Unchanged presets are left alone
+    assert fast_motor.wm_four == wm_four
+    assert not other.presets.has_presets
+
+
+@pytest.fixture(scope='function')
+def sqlite_presets(tmp_path):
+    db = tmp_path / 'presets.db'
+    user = tmp_path / 'user'
+    user.mkdir()
+    setup_preset_paths(hutch=db, user=user)
+    yield db
+    setup_preset_paths()
+
+
+def test_presets_sqlite(sqlite_presets, fast_motor, tmp_path):
+    logger.debug('test_presets_sqlite')
+    fast_motor.mv(3, wait=True)
+    fast_motor.presets.add_hutch('zero', 0, comment='center')
+    fast_motor.presets.add_here_hutch('three')
+    fast_motor.presets.add_here_user('sample')
+    assert fast_motor.wm_zero() == -3
+    assert fast_motor.wm_three() == 0
+    assert fast_motor.wm_sample() == 0
+    assert fast_motor.presets.positions.zero.path == str(sqlite_presets)
+
+    time.sleep(1)
+    fast_motor.presets.positions.zero.update_pos(1, comment='hats')
+    assert fast_motor.presets.positions.zero.pos == 1
+    history = fast_motor.presets.positions.zero.history
+    assert len(history) == 2
+    assert list(history.values())[-1].endswith('hats')
+    # Current values are loaded without the history
+    assert 'history' not in fast_motor.presets.positions.zero.info
+
+    fast_motor.presets.positions.three.deactivate()
+    assert not hasattr(fast_motor, 'wm_three')
+
+    # Another session sees the same database
+    other = FastMotor(name=fast_motor.name)
+    assert other.presets.positions.zero.pos == 1
+
+    store = get_sqlite_preset_store(sqlite_presets)
+    store.compact(keep=1)
+    assert len(fast_motor.presets.positions.zero.history) == 1
+
+    export = tmp_path / 'export'
+    store.export(export)
+    setup_preset_paths(hutch=export)
+    assert fast_motor.presets.positions.zero.pos == 1
+    assert len(fast_motor.presets.positions.zero.history) == 1
+    assert not hasattr(fast_motor, 'wm_three')
+
+
+def test_presets_state(presets, fast_motor, slow_motor, monkeypatch):
+    logger.debug('test_presets_state')
+    assert fast_motor.presets.state() == 'Unknown'
+    for num in range(10):
+        fast_motor.presets.add_hutch(f'p{num}', num * 2)
+    fast_motor.presets.add_user('odd', 5)
+    fast_motor.presets.positions.p3.deactivate()
+
+    reads = []
+    orig_wm = fast_motor.wm
+
+    def counting_wm():
+        reads.append(1)
+        return orig_wm()
+
+    monkeypatch.setattr(fast_motor, 'wm', counting_wm)
+    for pos, state in ((0, 'p0'), (4.3, 'p2'), (7.7, 'p4'), (5.1, 'odd'),
+                       (6, 'Unknown'), (18.4, 'p9'), (-3, 'Unknown')):
+        fast_motor.mv(pos, wait=True)
+        reads.clear()
+        assert fast_motor.presets.state() == state
+        assert len(reads) == 1
+        assert fast_motor.presets.state(position=pos) == state
+        assert len(reads) == 1
+
+    fast_motor.mv(8, wait=True)
+    assert fast_motor.status_info()['preset'] == 'p4'
+    assert preset_states([fast_motor, slow_motor]) == {
+        fast_motor.name: 'p4',
+        slow_motor.name: 'Unknown',
+    }
+
+    def broken_wm():
+        raise RuntimeError('cannot read position')
+
+    monkeypatch.setattr(fast_motor, 'wm', broken_wm)
+    assert preset_states([fast_motor])[fast_motor.name] == 'ERROR'
+
+
 def test_presets_type(presets, fast_motor):
     logger.debug('test_presets_type')
     # Mess up the input types, fail before opening the file
@@ -314,10 +556,127 @@ def test_tab_helper_class():
         assert attr in tab.get_filtered_dir_list()
 
     assert 'foobar' not in tab.get_filtered_dir_list()
+    # Instances share the class index until modified
+    assert tab._includes is MyDevice._class_tab._includes
+    assert 'foobar' in MyDevice._class_tab._matches
+    version = tab._version
     tab.add('foobar')
+    assert tab._version > version
+    assert tab._includes is not MyDevice._class_tab._includes
+    assert 'foobar' not in MyDevice._class_tab._includes
     assert 'foobar' in tab.get_filtered_dir_list()
+    other = MyDevice(name='other')
+    assert 'foobar' not in other._tab.get_filtered_dir_list()
     tab.remove('foobar')
     assert 'foobar' not in tab.get_filtered_dir_list()
     tab.add('foobar')
     tab.reset()
     assert 'foobar' not in tab.get_filtered_dir_list()
+    assert tab._includes is MyDevice._class_tab._includes
+
+    # Resetting the class keeps shared instances in step
+    MyDevice._class_tab.add('foobar')
+    MyDevice._class_tab.reset()
+    assert tab._includes is MyDevice._class_tab._includes
+    assert 'foobar' not in tab._includes
+    tab.add('foobar')
+    assert tab._includes == MyDevice._class_tab._includes | {'foobar'}
+
+
+class SlowSignal(ophyd.Signal):
+    def get(self, **kwargs):
+        time.sleep(0.5)
+        return super().get(**kwargs)
+
+
+class StatusDevice(BaseInterface, ophyd.Device):
+    slow = ophyd.Component(SlowSignal, value=1)
+    fast = ophyd.Component(ophyd.Signal, value=2)
+
+
+def test_status_info_deadline():
+    device = StatusDevice(name='dev')
+    device.status_timeout = 0.2
+    start = time.monotonic()
+    info = device.status_info()
+    assert time.monotonic() - start < 0.5
+    assert info['fast']['value'] == 2
+    assert 'timed_out' not in info['fast']
+    assert info['slow']['timed_out']
+    assert info['slow']['value'] is None
+    assert 'slow: (timed out)' in device.format_status_info(info)
+
+
+def test_status_info_concurrent():
+    device = StatusDevice(name='dev')
+    device.status_timeout = 2
+    info = device.status_info()
+    assert info['slow']['value'] == 1
+    assert 'timed_out' not in info['slow']
+
+
+def test_status_cache():
+    device = StatusDevice(name='dev')
+    device.enable_status_cache()
+    cache = device._status_cache
+    assert set(cache.stale_signals()) == {device.slow, device.fast}
+    info = device.status_info()
+    assert info['slow']['value'] == 1
+    assert not cache.stale_signals()
+
+    # Served from the table without calling the slow get
+    device.fast.put(3)
+    start = time.monotonic()
+    info = device.status_info()
+    assert time.monotonic() - start < 0.5
+    assert info['fast']['value'] == 3
+    assert info['slow']['value'] == 1
+
+    # Only changed values count as updates
+    cache.updated.clear()
+    device.fast.put(3)
+    assert not cache.updated.is_set()
+    device.fast.put(4)
+    assert cache.updated.is_set()
+
+    device.disable_status_cache()
+    assert device._status_cache is None
+    assert not cache.table
+    device.fast.put(5)
+    assert device.fast not in cache.table
+
+
+def test_status_cache_max_age():
+    device = StatusDevice(name='dev')
+    device.enable_status_cache(max_age=0.1)
+    device.status_info()
+    assert not device._status_cache.stale_signals()
+    time.sleep(0.2)
+    assert device.slow in device._status_cache.stale_signals()
+
+
+def test_redraw_lines():
+    assert redraw_lines([], ['a', 'b']) == 'a\nb\n'
+    assert redraw_lines(['a', 'b'], ['a', 'b']) == ''
+    assert redraw_lines(['a', 'b'], ['a', 'c']) == '\x1b[1A\r\x1b[2Kc\x1b[1B\r'
+    assert redraw_lines(['a', 'b'], ['c']) == '\x1b[2A\r\x1b[Jc\n'
+
+
+def test_watch():
+    device = StatusDevice(name='dev')
+    out = io.StringIO()
+    thread = threading.Thread(target=device.watch,
+                              kwargs=dict(max_rate=100, file=out))
+    thread.start()
+    time.sleep(1.5)
+    assert 'fast: 2' in out.getvalue()
+    device.fast.put(5)
+    time.sleep(0.2)
+    device.end_watch()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    text = out.getvalue()
+    assert text.endswith('\x1b[2Kfast: 5\x1b[1B\r')
+    # The rest of the display was not drawn again
+    assert text.count('slow: 1') == 1
+    assert device._status_cache is None
@@ -11,6 +11,7 @@ from ophyd.status import wait as wait_status
 
 from pcdsdevices.lxe import (LaserEnergyPlotContext, LaserEnergyPositioner,
                              LaserTiming, LaserTimingCompensation)
+from pcdsdevices.signal import notepad_writer
 from pcdsdevices.utils import convert_unit
 
 logger = logging.getLogger(__name__)
@@ -226,6 +227,7 @@ def test_laser_timing_notepad(lxt):
     assert lxt.notepad_readback.get() == 0
 
     lxt.mv(5e-6)
+    notepad_writer.flush()
     assert lxt.notepad_setpoint.get() == 5e-6
     assert lxt.notepad_readback.get() == 0
 
@@ -234,6 +236,7 @@ def test_laser_timing_notepad(lxt):
         lxt.done.put(1)
     lxt._fs_tgt_time.subscribe(complete_move, run=False)
     lxt.mv(5e-6)
+    notepad_writer.flush()
     assert lxt.notepad_setpoint.get() == 5e-6
     assert lxt.notepad_readback.get() == 5e-6
 
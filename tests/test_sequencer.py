@@ -171,6 +171,8 @@ def test_sequence_get_put():
 
     # Write the dummy sequence
     seq.sequence.put_seq(dummy_sequence)
+    # The sequence is processed before put_seq returns
+    assert seq.sequence.seq_proc.get() == 1
 
     # Read back the sequence, and compare to dummy sequence
     curr_seq = seq.sequence.get_seq()
@@ -1,14 +1,19 @@
 import logging
 import threading
+import time
 from unittest.mock import Mock
 
+import numpy as np
 import pytest
-from ophyd.signal import EpicsSignal, EpicsSignalRO, Signal
+from ophyd.signal import (EpicsSignal, EpicsSignalRO, ReadTimeoutError,
+                          Signal)
 from ophyd.sim import FakeEpicsSignal
 
 import pcdsdevices
-from pcdsdevices.signal import (AvgSignal, PytmcSignal, SignalEditMD,
-                                UnitConversionDerivedSignal)
+from pcdsdevices.signal import (AggregateSignal, AvgSignal, PytmcSignal,
+                                NotepadWriter, RollingStats,
+                                RollingStatsSignal, SignalEditMD,
+                                UnitConversionDerivedSignal, put_batch)
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +58,149 @@ def test_avg_signal():
     assert cb.called
 
 
+def test_rolling_stats():
+    logger.debug('test_rolling_stats')
+    rng = np.random.default_rng(0)
+    data = rng.normal(1e6, 3, size=1000)
+    data[::7] = np.nan
+    stats = RollingStats(size=50)
+    for num, value in enumerate(data):
+        stats.add(value)
+        window = data[max(num - 49, 0):num + 1]
+        if num % 97 == 1 or num == len(data) - 1:
+            assert stats.count == np.count_nonzero(~np.isnan(window))
+            assert stats.mean == pytest.approx(np.nanmean(window))
+            assert stats.std == pytest.approx(np.nanstd(window), rel=1e-6)
+            assert stats.min == np.nanmin(window)
+            assert stats.max == np.nanmax(window)
+    np.testing.assert_array_equal(stats.values, data[-50:])
+
+    with pytest.raises(ValueError):
+        RollingStats()
+
+
+def test_rolling_stats_window():
+    logger.debug('test_rolling_stats_window')
+    stats = RollingStats(window=1.0)
+    for timestamp, value in ((0, 5), (0.5, 1), (1.2, 3), (1.4, np.nan)):
+        stats.add(value, timestamp=timestamp)
+    # The value at time 0 has expired
+    assert len(stats) == 3
+    assert stats.get_stats() == dict(mean=2, std=1, min=1, max=3, count=2)
+    stats.add(4, timestamp=10)
+    assert stats.get_stats() == dict(mean=4, std=0, min=4, max=4, count=1)
+
+
+def test_rolling_stats_signal():
+    logger.debug('test_rolling_stats_signal')
+    sig = Signal(name='raw')
+    maximum = RollingStatsSignal(sig, 3, stat='max', name='max')
+    for value in (1, 5, 2, 3, 4):
+        sig.put(value)
+    assert maximum.get() == 4
+    assert maximum.stats['min'] == 2
+    assert maximum.stats['mean'] == 3
+    maximum.averages = 5
+    assert maximum.stats['count'] == 0
+    with pytest.raises(ValueError):
+        RollingStatsSignal(sig, 3, stat='median', name='median')
+
+
+class SlowSignal(Signal):
+    delay = 0.5
+    reads = 0
+
+    def get(self, **kwargs):
+        type(self).reads += 1
+        time.sleep(self.delay)
+        return super().get(**kwargs)
+
+
+class SumSignal(AggregateSignal):
+    def __init__(self, signals, **kwargs):
+        super().__init__(**kwargs)
+        self._sub_signals.extend(signals)
+
+    def _calc_readback(self):
+        return sum(self._cache[sig] for sig in self._sub_signals)
+
+
+@pytest.mark.timeout(5)
+def test_aggregate_signal_concurrent():
+    logger.debug('test_aggregate_signal_concurrent')
+    signals = [SlowSignal(name=f'slow{num}', value=num) for num in range(5)]
+    agg = SumSignal(signals, name='sum')
+    start = time.monotonic()
+    assert agg.get() == 10
+    # Read at the same time, not one after another
+    assert time.monotonic() - start < 5 * SlowSignal.delay
+    assert agg.late_signals == []
+
+    signals[0].delay = 2
+    with pytest.raises(ReadTimeoutError):
+        agg.get(timeout=0.8)
+    assert agg.late_signals == [signals[0]]
+    del signals[0].delay
+
+    # Once subscribed, rely on the monitors
+    cb = Mock()
+    agg.subscribe(cb, run=False)
+    SlowSignal.reads = 0
+    signals[1].put(11)
+    assert cb.call_args[1]['value'] == 20
+    assert agg.get() == 20
+    assert SlowSignal.reads == 0
+
+
+@pytest.mark.timeout(5)
+def test_aggregate_signal_nested():
+    logger.debug('test_aggregate_signal_nested')
+    # More nested aggregates than read threads, this must not deadlock
+    outer = []
+    for num in range(20):
+        inner = [SumSignal([Signal(name=f'sig{num}_{sub}', value=1)
+                            for sub in range(2)],
+                           name=f'inner{num}_{sub}')
+                 for sub in range(2)]
+        outer.append(SumSignal(inner, name=f'outer{num}'))
+    agg = SumSignal(outer, name='top')
+    assert agg.get() == 80
+    assert agg.late_signals == []
+
+
+@pytest.mark.timeout(5)
+def test_aggregate_signal_coalesce():
+    logger.debug('test_aggregate_signal_coalesce')
+    signals = [Signal(name=f'sig{num}', value=0) for num in range(3)]
+    agg = SumSignal(signals, name='sum', coalesce_window=0.1,
+                    max_emit_rate=2)
+    values = []
+    done = threading.Event()
+
+    def cb(value, old_value, **kwargs):
+        values.append((old_value, value))
+        done.set()
+
+    agg.subscribe(cb, run=False)
+    for num in range(1, 4):
+        for sig in signals:
+            sig.put(num)
+    assert done.wait(timeout=2)
+    assert values == [(0, 9)]
+    stats = agg.coalesce_stats
+    assert stats['updates'] == 9
+    assert stats['saved'] == 8
+    assert stats['emits'] == 1
+
+    # Limited by the emit rate
+    done.clear()
+    signals[0].put(10)
+    start = time.monotonic()
+    assert done.wait(timeout=2)
+    assert values[-1] == (9, 16)
+    assert time.monotonic() - start > 0.3
+
+
 class MockCallbackHelper:
     """
     Simple helper for getting a callback, setting an event, and checking args.
@@ -128,6 +276,23 @@ def test_unit_conversion_signal_metadata_sub(unit_conv_signal):
     assert helper.call_kwargs['units'] == 'mm'
 
 
+def test_unit_conversion_signal_cache(unit_conv_signal):
+    orig = unit_conv_signal.derived_from
+    orig.sim_set_limits((-1, 2))
+    assert unit_conv_signal.limits == (-1_000, 2_000)
+    desc = unit_conv_signal.describe()[unit_conv_signal.name]
+    # Callers may modify the description without touching the cache
+    desc['units'] = 'garbage'
+    assert unit_conv_signal.describe()[unit_conv_signal.name]['units'] == 'mm'
+
+    # Offset changes clear the cached values
+    unit_conv_signal.user_offset = 10
+    assert unit_conv_signal.limits == (-990, 2_010)
+    # As do metadata updates from the original signal
+    orig.sim_set_limits((0, 1))
+    assert unit_conv_signal.limits == (10, 1_010)
+
+
 def test_optional_epics_signal(monkeypatch):
     monkeypatch.setattr(pcdsdevices.signal, 'EpicsSignal', FakeEpicsSignal)
     opt = pcdsdevices.signal._OptionalEpicsSignal('test', name='opt')
@@ -163,6 +328,18 @@ def test_optional_epics_signal(monkeypatch):
     assert not opt.connected
 
 
+def test_optional_epics_signal_dispatch(monkeypatch):
+    monkeypatch.setattr(pcdsdevices.signal, 'EpicsSignal', FakeEpicsSignal)
+    opt = pcdsdevices.signal._OptionalEpicsSignal('test', name='opt')
+    # Bound once per connection change rather than chosen on every call
+    assert opt.get.__self__ is opt
+    opt._epics_signal._run_subs(sub_type='meta', connected=True)
+    assert opt.get.__self__ is opt._epics_signal
+    assert opt.put.__self__ is opt._epics_signal
+    opt.destroy()
+    assert 'get' not in vars(opt)
+
+
 def test_pvnotepad_signal(monkeypatch):
     monkeypatch.setattr(pcdsdevices.signal, 'EpicsSignal', FakeEpicsSignal)
     sig = pcdsdevices.signal.NotepadLinkedSignal(
@@ -179,6 +356,109 @@ def test_pvnotepad_signal(monkeypatch):
     sig.destroy()
 
 
+@pytest.mark.timeout(5)
+def test_notepad_writer():
+    logger.debug('test_notepad_writer')
+    writer = NotepadWriter(max_rate=5)
+    sig = Signal(name='notepad', value=0.0)
+    other = Signal(name='other', value=0.0)
+    puts = []
+    sig.subscribe(lambda value, **kwargs: puts.append(value), run=False)
+
+    for num in range(1, 20):
+        writer.submit(sig, float(num))
+    writer.submit(other, 0.05, deadband=0.1)
+    start = time.monotonic()
+    writer.flush(timeout=2)
+    # Only the latest value, nothing inside the deadband
+    assert sig.get() == 19
+    assert other.get() == 0
+    assert 1 <= len(puts) <= 2
+    assert writer.counts['submitted'] == 20
+
+    writer.submit(sig, 20.0)
+    writer.submit(sig, 21.0)
+    while sig.get() != 21:
+        time.sleep(0.01)
+    # Limited by max_rate
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.timeout(5)
+def test_put_batch():
+    logger.debug('test_put_batch')
+    events = []
+
+    def slow_put(name):
+        def put(value, use_complete=None, callback=None, **kwargs):
+            assert use_complete
+            events.append(('start', name))
+
+            def done():
+                events.append(('done', name))
+                callback()
+            threading.Timer(0.3, done).start()
+        return put
+
+    epics_sigs = [EpicsSignal(f'PV:{num}', name=f'pv{num}')
+                  for num in range(3)]
+    for sig in epics_sigs:
+        sig.put = slow_put(sig.name)
+    last = Signal(name='last')
+    last.subscribe(lambda value, **kwargs: events.append(('put', value)),
+                   run=False)
+
+    start = time.monotonic()
+    with put_batch() as batch:
+        for sig in epics_sigs:
+            batch.put(sig, 1)
+        batch.barrier()
+        batch.put(last, 5)
+    assert batch.status.success
+    # Concurrent, not one after another
+    assert time.monotonic() - start < 0.6
+    assert [event for event, _ in events[:3]] == ['start'] * 3
+    assert events[-1] == ('put', 5)
+
+    class BadSignal(Signal):
+        def put(self, value, **kwargs):
+            raise ValueError('bad put')
+
+    with pytest.raises(ValueError):
+        with put_batch() as batch:
+            batch.put(BadSignal(name='bad'), 1)
+            batch.barrier()
+            batch.put(last, 6)
+    assert last.get() == 5
+
+    def stuck_put(value, use_complete=None, callback=None, **kwargs):
+        pass
+
+    stuck = EpicsSignal('PV:STUCK', name='stuck')
+    stuck.put = stuck_put
+    with pytest.raises(Exception):
+        with put_batch(timeout=0.2) as batch:
+            batch.put(stuck, 1)
+    assert not batch.status.success
+
+
+def test_put_batch_no_wait_logs(caplog):
+    logger.debug('test_put_batch_no_wait_logs')
+
+    class BadSignal(Signal):
+        def put(self, value, **kwargs):
+            raise ValueError('bad put')
+
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        with put_batch(wait=False) as batch:
+            batch.put(BadSignal(name='bad'), 1)
+        with pytest.raises(ValueError):
+            batch.status.wait(timeout=1)
+        time.sleep(0.1)
+    assert 'bad put' in caplog.text
+
+
 def test_editmd_signal():
     sig = SignalEditMD(name='sig')
     cache = {}
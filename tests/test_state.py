@@ -1,3 +1,4 @@
+import itertools
 import logging
 from unittest.mock import Mock
 
@@ -6,8 +7,11 @@ from ophyd.device import Component as Cpt
 from ophyd.signal import Signal
 from ophyd.sim import make_fake_device
 
-from pcdsdevices.state import (PVStatePositioner, StatePositioner,
-                               StateRecordPositioner, StateStatus)
+from pcdsdevices.pulsepicker import PulsePickerInOut
+from pcdsdevices.state import (PVStatePositioner, StateLogicTable,
+                               StatePositioner, StateRecordPositioner,
+                               StateStatus, TwinCATStatePositioner,
+                               _evaluate_state_logic)
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +99,47 @@ def test_pvstate_positioner_logic():
         lim_obj.states_enum['defer']
 
 
+def test_state_logic_table():
+    logger.debug('test_state_logic_table')
+    for cls in (LimCls, PulsePickerInOut):
+        table = cls._state_logic_table
+        values = [list(info) + ['garbage']
+                  for info in cls._state_logic.values()]
+        for readback in itertools.product(*values):
+            expected, _ = _evaluate_state_logic(
+                cls._state_logic, cls._state_logic_mode, cls._unknown,
+                readback)
+            assert table.lookup(readback) == expected
+
+    # Both limits at once is reported, as is a state that cannot happen
+    assert LimCls._state_logic_table.contradictions == [(0, 0)]
+    table = StateLogicTable({'a': {0: 'IN', 1: 'OUT'},
+                             'b': {0: 'MID', 1: 'defer'}},
+                            mode='FIRST', states=['GONE'])
+    assert table.unreachable == ['MID', 'GONE']
+    assert not table.contradictions
+    assert len(table.report()) == 2
+
+
+def test_pvstate_positioner_logic_change():
+    logger.debug('test_pvstate_positioner_logic_change')
+    lim_obj = LimCls('BASE', name='test')
+    lim_obj.lowlim.put(0)
+    lim_obj.highlim.put(1)
+    assert lim_obj.position == 'IN'
+    # Contradictory limits: unknown, unless the first one wins
+    lim_obj.highlim.put(0)
+    assert lim_obj.position == 'Unknown'
+    lim_obj._state_logic_mode = 'FIRST'
+    assert lim_obj.position == 'IN'
+    table = lim_obj._get_state_logic_table()
+    assert table is not LimCls._state_logic_table
+    assert table.lookup((0, 0)) == 'in'
+    lim_obj._state_logic = {'lowlim': {0: 'out', 1: 'defer'},
+                            'highlim': {0: 'in', 1: 'defer'}}
+    assert lim_obj.position == 'OUT'
+
+
 def test_pvstate_positioner_describe():
     logger.debug('test_pvstate_positioner_describe')
     lim_obj = LimCls('BASE', name='test')
@@ -205,3 +250,23 @@ def test_auto_states():
     enum_strs = ('Unknown', 'IN', 'OUT')
     states.state._run_subs(sub_type=states.state.SUB_META, enum_strs=enum_strs)
     assert states.states_list == list(enum_strs)
+
+
+def test_twincat_state_config_snapshot():
+    logger.debug('test_twincat_state_config_snapshot')
+    FakeState = make_fake_device(TwinCATStatePositioner)
+    state = FakeState('PREFIX', name='state')
+    # The config is only made on first use
+    assert 'config' not in state._signals
+    config = state.config
+    assert 'config' in state._signals
+    config.state02.state_name.sim_put('IN')
+    config.state02.setpoint.sim_put(12.5)
+    config.state02.delta.sim_put(0.5)
+
+    table = config.snapshot(timeout=1)
+    assert [row['state'] for row in table] == list(config.component_names)
+    assert table[1] == {'state': 'state02', 'state_name': 'IN',
+                        'setpoint': 12.5, 'delta': 0.5, 'velo': 0}
+    table = config.snapshot(fields=['setpoint'])
+    assert table[1] == {'state': 'state02', 'setpoint': 12.5}
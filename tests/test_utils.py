@@ -1,9 +1,12 @@
 import logging
 import pty
+import subprocess
 import sys
 import threading
 import time
 
+import numpy as np
+import pint
 import pytest
 
 import pcdsdevices.utils as util
@@ -79,3 +82,93 @@ def test_get_status_float():
     res = util.get_status_float(dummy_dictionary, 'dict1', 'dict2', 'value',
                                 precision=3)
     assert res == '23.343'
+
+
+@pytest.mark.timeout(5)
+def test_task_scheduler():
+    logger.debug('test_task_scheduler')
+    scheduler = util.TaskScheduler(name='test_scheduler')
+    calls = []
+    done = threading.Event()
+
+    def task(num):
+        calls.append(num)
+        if num == 'last':
+            done.set()
+
+    scheduler.schedule(task, args=(2,), delay=0.2)
+    scheduler.schedule(task, args=(1,), delay=0.1)
+    first = scheduler.schedule(task, args=(3,), delay=0.3, coalesce=True)
+    assert scheduler.schedule(task, args=(3,), delay=0.3,
+                              coalesce=True) is first
+    cancel = scheduler.schedule(task, args=('cancel',), delay=0.1)
+    assert cancel.cancel()
+    scheduler.schedule(task, args=('last',), delay=0.4)
+    assert scheduler.queue_depth == 4
+    assert done.wait(timeout=2)
+    assert calls == [1, 2, 3, 'last']
+    assert not first.cancel()
+
+    metrics = scheduler.metrics()
+    assert metrics['queue_depth'] == 0
+    assert metrics['scheduled'] == 5
+    assert metrics['executed'] == 4
+    assert metrics['cancelled'] == 1
+    assert metrics['coalesced'] == 1
+    assert metrics['max_depth'] == 4
+    assert 0 <= metrics['mean_lateness'] <= metrics['max_lateness'] < 1
+
+
+@pytest.mark.timeout(5)
+def test_schedule_task():
+    logger.debug('test_schedule_task')
+    calls = []
+    done = threading.Event()
+
+    def task(num, key=None):
+        calls.append((num, key))
+        done.set()
+
+    threads = threading.active_count()
+    for _ in range(10):
+        util.schedule_task(task, args=(1,), kwargs=dict(key='a'), delay=0.1,
+                           coalesce=True)
+    # No new thread for each task
+    assert threading.active_count() <= threads + 1
+    assert done.wait(timeout=2)
+    time.sleep(0.2)
+    assert calls == [(1, 'a')]
+
+
+def test_convert_unit():
+    logger.debug('test_convert_unit')
+    assert util.convert_unit(2, 'mm', 'um') == pytest.approx(2000)
+    assert util.convert_unit(100, 'degC', 'degF') == pytest.approx(212)
+    converter = util.get_unit_converter('s', 'ns')
+    assert converter.affine
+    assert util.get_unit_converter('s', 'ns') is converter
+    values = np.linspace(-1, 1, 5)
+    np.testing.assert_allclose(util.convert_unit(values, 's', 'ns'),
+                               values * 1e9)
+
+
+def test_convert_unit_not_affine():
+    logger.debug('test_convert_unit_not_affine')
+    try:
+        converter = util.get_unit_converter('dBm', 'mW')
+    except pint.errors.UndefinedUnitError:
+        pytest.skip('Logarithmic units need a newer pint')
+    assert not converter.affine
+    np.testing.assert_allclose(converter([0, 10, 20]), [1, 10, 100])
+
+
+def test_unit_registry_lazy():
+    logger.debug('test_unit_registry_lazy')
+    code = ('import sys; import pcdsdevices.signal, pcdsdevices.lxe; '
+            'assert "pint" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+    registry = util.get_unit_registry()
+    assert util.get_unit_registry() is registry
+    quantity = registry.Quantity(1, 'mm')
+    assert quantity.to('um').magnitude == pytest.approx(1000)